@@ -0,0 +1,62 @@
+# ============================
+# agregacao.py — Somas por Estado, Região Turística e Município
+# ============================
+
+METRICAS = [
+    "Empregos",
+    "Estabelecimentos",
+    "Visitas Nacionais",
+    "Visitas Internacionais",
+    "Visitas",
+    "Arrecadação",
+]
+
+DIMENSOES = ["Estado", "Região Turística", "Município", "codigo_ibge"]
+
+
+# ---------- CUBO DE AGREGAÇÃO ----------
+# Uma única passada (groupby) sobre as linhas filtradas gera as somas por
+# município; Região Turística, Estado e os totais saem dessa tabela, que é
+# bem menor que os dados. Gráficos, KPIs e o texto do relatório leem daqui
+# em vez de refazer o groupby.
+
+def somar(df, por):
+    # As métricas ficam em tipos compactos (int16/int32) na memória; as
+    # somas são feitas em 64 bits para não estourar
+    valores = df[por].assign(**{
+        m: df[m].astype("float64" if df[m].dtype.kind == "f" else "int64") for m in METRICAS
+    })
+    return valores.groupby(por, sort=False, dropna=False, observed=True)[METRICAS].sum()
+
+
+class CuboAgregado:
+    def __init__(self, df):
+        self._derivar(somar(df, DIMENSOES).reset_index(), len(df))
+
+    @classmethod
+    def de_somas(cls, municipio, linhas):
+        # Somas por município já calculadas fora do pandas (consultas.py):
+        # uma linha por município, colunas DIMENSOES + METRICAS
+        cubo = cls.__new__(cls)
+        cubo._derivar(municipio, linhas)
+        return cubo
+
+    def _derivar(self, municipio, linhas):
+        # linhas: quantas linhas dos dados entraram nas somas
+        self.linhas = linhas
+        self.municipio = municipio
+
+        self.regiao = (municipio.groupby(["Estado", "Região Turística"], observed=True)[METRICAS]
+                       .sum().reset_index())
+        self.estado = municipio.groupby("Estado", observed=True)[METRICAS].sum().reset_index()
+        self.totais = municipio[METRICAS].sum()
+
+    def kpis(self):
+        return (
+            int(self.totais["Empregos"]),
+            int(self.totais["Estabelecimentos"]),
+            int(self.totais["Visitas Nacionais"]),
+            int(self.totais["Visitas Internacionais"]),
+            float(self.totais["Arrecadação"]),
+        )
+
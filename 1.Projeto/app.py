@@ -4,23 +4,26 @@
 
 # ---------- IMPORTS ----------
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.io as pio
-import json
 from datetime import datetime
-from zoneinfo import ZoneInfo
-import tempfile
+from functools import partial, wraps
+import json
 import os
-
-# reportlab para montar PDF
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.units import inch
-from reportlab.lib import colors
-from reportlab.lib.styles import ParagraphStyle
-from reportlab.lib.enums import TA_RIGHT
+import threading
+import uuid
+
+from atualizacao import AtualizadorBase
+from cache_figuras import CacheFiguras, chave_figura
+from cache_relatorios import FUSO_HORARIO, CacheRelatorios, chave_relatorio
+from consultas import Consulta, criar_consultas
+from dados import caminho_particao, carregar_mapeado
+from filtros import EXCLUIR, INCLUIR, TODOS, SelecaoMunicipios
+from formatacao import formatar_inteiro, formatar_moeda
+from geometria import MalhaMapeada, caminho_nivel, escolher_nivel
+from graficos import (ZOOM_MAPA, aquecer, figura_empregos, figura_estabelecimentos,
+                      figura_evolucao_arrecadacao, figura_mapa_arrecadacao, figura_mapa_visitas, figura_visitas)
+from ingestao import ANO_PLANILHA, PASTA_DADOS
+from medicao import Cronometro, registrar
+from tarefas import FilaRelatorios
 
 # ---------- CONFIG PAGE ----------
 st.set_page_config(
@@ -30,10 +33,156 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# ---------- MEDIÇÃO ----------
+# Tempo de cada trecho desta execução do script; no fim vai para o log
+# (medicao.py) e, com ?debug=1 na URL, para um painel no rodapé.
+cronometro = Cronometro()
+sessao_id = st.session_state.setdefault("sessao_id", uuid.uuid4().hex[:12])
+st.session_state["execucao"] = st.session_state.get("execucao", 0) + 1
+modo_debug = st.query_params.get("debug") == "1" or os.environ.get("PAINEL_DEBUG") == "1"
+
+
+def medir_fragmento(nome):
+    # Numa execução completa, os trechos do fragmento entram no cronômetro
+    # da execução. Quando só o fragmento roda de novo, esse cronômetro já
+    # foi registrado: os trechos ganham um cronômetro e um registro próprios.
+    def decorador(funcao):
+        @wraps(funcao)
+        def executar(*args, **kwargs):
+            global cronometro
+            if not cronometro.registrado:
+                return funcao(*args, **kwargs)
+            cronometro = Cronometro()
+            try:
+                return funcao(*args, **kwargs)
+            finally:
+                registrar("fragmento", cronometro, fragmento=nome, sessao=sessao_id,
+                          versao_dados=versao_dados, filtros=cardinalidade_filtros)
+        return executar
+    return decorador
+
 # ---------- LEITURA DO ARQUIVO ----------
 BASE_DIR = os.path.dirname(__file__)
 file_path = os.path.join(BASE_DIR, "planilha.xlsx")
-df = pd.read_excel(file_path)
+
+# Base por ano (dados.py, ingestao.py): uma partição Parquet por edição
+# do Mapa do Turismo em PASTA_DADOS. A planilha.xlsx (ANO_PLANILHA) entra
+# na base sozinha.
+
+# Backend das consultas (consultas.py): "pandas" (padrão) mantém os anos
+# selecionados num DataFrame; "duckdb" consulta as partições direto.
+BACKEND_CONSULTAS = os.environ.get("PAINEL_BACKEND", "pandas")
+
+# Seleção com todos os filtros abertos (a inicial da barra lateral)
+SELECAO_INICIAL = {"estados": "*", "municipios": "*", "regioes": "*"}
+
+
+# Cache por processo: todas as sessões compartilham os mesmos dados e o
+# índice da barra lateral de cada conjunto de anos; só as partições dos
+# anos selecionados são lidas. pasta é a do instantâneo da base e a
+# versão das partições entra na chave. Os dados não devem ser alterados
+# in-place.
+@st.cache_resource(show_spinner=False, max_entries=8)
+def carregar_dados(pasta, anos, versao, backend):
+    if backend == "duckdb":
+        return criar_consultas(backend, caminhos_parquet=[caminho_particao(pasta, ano) for ano in anos])
+    # Arquivo Arrow mapeado: as réplicas do painel no mesmo servidor
+    # dividem as mesmas páginas de memória (dados.carregar_mapeado)
+    return criar_consultas(backend, df=carregar_mapeado(pasta, anos, versao))
+
+
+def preparar_instantaneo(instantaneo):
+    # Roda na thread do atualizador antes da troca: dados do ano mais
+    # recente, índice dos filtros e cubo da seleção inicial já ficam nos
+    # caches quando a primeira sessão pedir a versão nova
+    anos = (instantaneo.anos[-1],)
+    versao = instantaneo.versao_anos(anos)
+    consultas = carregar_dados(instantaneo.pasta, anos, versao, BACKEND_CONSULTAS)
+    agregar(consultas, SELECAO_INICIAL, versao, BACKEND_CONSULTAS,
+            json.dumps(SELECAO_INICIAL, sort_keys=True, ensure_ascii=False))
+
+
+# A planilha (e as partições gravadas pelo ingestao.py) são observadas em
+# segundo plano; uma mudança vira um instantâneo novo da base, trocado
+# sem reiniciar o painel (atualizacao.py)
+@st.cache_resource(show_spinner=False)
+def obter_atualizador(caminho):
+    return AtualizadorBase(caminho, ANO_PLANILHA, PASTA_DADOS, preparar=preparar_instantaneo)
+
+
+with cronometro.etapa("carga.dados"):
+    # Um instantâneo por execução: se uma versão nova for publicada no
+    # meio dela, esta execução termina com a anterior
+    instantaneo = obter_atualizador(file_path).atual()
+    anos_base = instantaneo.anos
+
+    # Período: por padrão só o ano mais recente. KPIs, gráficos por Estado,
+    # mapas e relatório mostram o último ano do período; a evolução da
+    # arrecadação, o período inteiro.
+    if len(anos_base) > 1:
+        ano_inicial, ano_final = st.sidebar.select_slider(
+            "Anos", anos_base, value=(anos_base[-1], anos_base[-1]), key="anos")
+    else:
+        ano_inicial = ano_final = anos_base[0]
+    anos = [ano for ano in anos_base if ano_inicial <= ano <= ano_final]
+
+    versao_dados = instantaneo.versao_anos(anos)
+    consultas = carregar_dados(instantaneo.pasta, tuple(anos), versao_dados, BACKEND_CONSULTAS)
+    indice = consultas.indice
+
+# ---------- LEITURA DA MALHA MUNICIPAL ----------
+# O mapa.json é convertido uma vez para Arrow (mapa.arrow), que cada
+# processo mapeia na memória e indexa por código IBGE; cada mapa recebe
+# só as geometrias dos municípios filtrados.
+# Se existirem as versões simplificadas (python simplificar_mapa.py),
+# o nível de detalhe é escolhido pelo zoom e pela quantidade de municípios.
+geojson_path = os.path.join(BASE_DIR, "mapa.json")
+
+
+@st.cache_resource(show_spinner=False)
+def carregar_malha(caminho, mtime):
+    return MalhaMapeada.de_arquivo(caminho)
+
+
+def arquivo_malha(qtd_municipios):
+    # Arquivo da malha para essa quantidade de municípios: o nível
+    # simplificado escolhido ou, se ele não foi gerado, o mapa.json
+    caminho = caminho_nivel(geojson_path, escolher_nivel(ZOOM_MAPA, qtd_municipios))
+    return caminho if os.path.exists(caminho) else geojson_path
+
+
+def nivel_malha(qtd_municipios):
+    # (caminho, mtime) do arquivo da malha usado para essa quantidade de
+    # municípios; também entra na chave do cache dos mapas
+    caminho = arquivo_malha(qtd_municipios)
+    # Abrir o arquivo com tratamento de erro
+    try:
+        return caminho, os.path.getmtime(caminho)
+    except FileNotFoundError:
+        st.error(f"Arquivo 'mapa.json' não encontrado em: {geojson_path}")
+        st.stop()  # Para a execução do app se o arquivo não existir
+
+
+# ---------- AQUECIMENTO DO PROCESSO ----------
+# Uma vez por processo, logo na primeira execução: uma thread prepara o
+# Plotly (primeira figura de cada tipo) e a malha do mapa da seleção
+# inicial enquanto esta execução segue com a barra lateral e o cubo.
+# Quem chegar antes à mesma etapa espera por ela, sem repetir o trabalho.
+# A pilha do relatório (reportlab, matplotlib) não entra aqui: só é
+# importada quando alguém pede um PDF.
+@st.cache_resource(show_spinner=False)
+def aquecer_processo(qtd_municipios):
+    def preparar():
+        aquecer()
+        caminho = arquivo_malha(qtd_municipios)
+        if os.path.exists(caminho):
+            carregar_malha(caminho, os.path.getmtime(caminho)).subconjunto([])
+
+    threading.Thread(target=preparar, name="aquecimento", daemon=True).start()
+    return True
+
+
+aquecer_processo(len(indice.linhas_municipio))
 
 # ---------- TÍTULO (HTML/CSS) ----------
 st.markdown("""
@@ -51,11 +200,13 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # ---------- LEGENDA do DASHBOARD ----------
+legenda_anos = f"ano-base {ano_final}" if ano_inicial == ano_final \
+    else f"anos-base {ano_inicial} a {ano_final}; indicadores de {ano_final}"
 st.markdown(
-    """
+    f"""
     <div style='width: 100%; text-align: right; padding-right: 10px;'>
         <span style='font-size: 0.8em; color: black; font-weight: bold;'>
-        Dados extraídos do Mapa do Turismo Brasileiro (ano-base 2018)
+        Dados extraídos do Mapa do Turismo Brasileiro ({legenda_anos})
         </span>
     </div>
     """,
@@ -132,24 +283,62 @@ st.markdown(
 )
 
 # ---------- BARRA LATERAL ----------
-
-estado = sorted(df["Estado"].unique())
-se_estado = st.sidebar.multiselect("Estado", estado, default=estado
-                                   )
-
-municipio = sorted(df[df["Estado"].isin(se_estado)]["Município"].unique())
-se_municipio = st.sidebar.multiselect("Município", municipio, default=municipio
-                                      )
-turismo = sorted(df[(df["Estado"].isin(se_estado)) & (
-    df["Município"].isin(se_municipio))]["Região Turística"].unique())
-se_turismo = st.sidebar.multiselect("Região Turística", turismo, default=turismo
-                                    )
-
-df_filtrado = df[
-    (df["Estado"].isin(se_estado)) &
-    (df["Município"].isin(se_municipio)) &
-    (df["Região Turística"].isin(se_turismo))
-].copy()
+# Município: em "Todos" nenhuma lista vai ao navegador. Em "Somente" e
+# "Exceto" as opções do multiselect são os municípios já escolhidos mais
+# uma página da busca, feita no servidor.
+MODOS_MUNICIPIO = {"Todos": TODOS, "Somente": INCLUIR, "Exceto": EXCLUIR}
+MUNICIPIOS_POR_PAGINA = 50
+
+
+def reiniciar_pagina_municipios():
+    st.session_state.pop("pagina_municipios", None)
+
+
+with cronometro.etapa("filtro"):
+    estado = indice.estados
+    se_estado = st.sidebar.multiselect("Estado", estado, default=estado
+                                       )
+
+    modo_municipio = MODOS_MUNICIPIO[st.sidebar.radio("Município", list(MODOS_MUNICIPIO),
+                                                      horizontal=True, key="modo_municipio")]
+    escolhidos = []
+    if modo_municipio != TODOS:
+        busca = st.sidebar.text_input("Buscar município", key="busca_municipio",
+                                      placeholder="Digite parte do nome",
+                                      on_change=reiniciar_pagina_municipios)
+        pagina = st.session_state.get("pagina_municipios", 1)
+        encontrados, total = indice.buscar_municipios(se_estado, busca, pagina - 1, MUNICIPIOS_POR_PAGINA)
+        paginas = max(1, -(-total // MUNICIPIOS_POR_PAGINA))
+        if pagina > paginas:
+            # Menos resultados que antes (outro Estado, outra busca): última página
+            pagina = st.session_state["pagina_municipios"] = paginas
+            encontrados, total = indice.buscar_municipios(se_estado, busca, pagina - 1, MUNICIPIOS_POR_PAGINA)
+        if paginas > 1:
+            st.sidebar.number_input(f"Página (de {paginas})", min_value=1, max_value=paginas,
+                                    key="pagina_municipios")
+        elif "pagina_municipios" in st.session_state:
+            del st.session_state["pagina_municipios"]
+        st.sidebar.caption(f"{total} município(s) encontrado(s)")
+
+        ja_escolhidos = st.session_state.get("municipios_escolhidos", [])
+        escolhidos = st.sidebar.multiselect(
+            "Incluir" if modo_municipio == INCLUIR else "Excluir",
+            sorted(set(ja_escolhidos) | set(encontrados)), key="municipios_escolhidos")
+    se_municipio = SelecaoMunicipios(modo_municipio, escolhidos)
+
+    turismo = indice.opcoes_regiao(se_estado, se_municipio)
+    se_turismo = st.sidebar.multiselect("Região Turística", turismo, default=turismo
+                                        )
+
+    # Forma canônica da seleção: filtro das consultas e chave dos caches.
+    # Com mais de um ano carregado, o cubo fica só com o último.
+    selecao = indice.selecao_normalizada(se_estado, se_municipio, se_turismo)
+    selecao_cubo = selecao if len(anos) == 1 else {**selecao, "anos": [ano_final]}
+
+# Tamanho da seleção, registrado junto com os tempos
+cardinalidade_filtros = {"estados": len(se_estado), "municipios_modo": se_municipio.modo,
+                         "municipios": len(se_municipio.municipios),
+                         "regioes": len(se_turismo), "anos": len(anos), "backend": BACKEND_CONSULTAS}
 
 logo_path = os.path.join(BASE_DIR, ".png")
 col1, col2, col3 = st.sidebar.columns([1,4,3])
@@ -157,19 +346,28 @@ col1, col2, col3 = st.sidebar.columns([1,4,3])
 with col2:
     st.image(logo_path, width=260)
 
+# ---------- AGREGAÇÃO ----------
+# Somas por Estado/Região/Município calculadas uma vez por seleção de
+# filtros (filtro e agrupamento numa só consulta ao backend) e
+# compartilhadas por KPIs, gráficos e relatório.
+@st.cache_resource(show_spinner=False, max_entries=64)
+def agregar(_consultas, _selecao, versao, backend, chave_selecao):
+    return _consultas.cubo(_selecao)
+
+
+with cronometro.etapa("agregacao"):
+    cubo = agregar(consultas, selecao_cubo, versao_dados, BACKEND_CONSULTAS,
+                   json.dumps(selecao_cubo, sort_keys=True, ensure_ascii=False))
+cardinalidade_filtros["linhas"] = cubo.linhas
+
 # ---------- FUNÇÃO KPI ----------
 
-def calcula_kpis(df):
-    total_empregos = int(df["Empregos"].sum())
-    qtd_estabelecimentos = int(df["Estabelecimentos"].sum())
-    visitas_nac = int(df["Visitas Nacionais"].sum())
-    visitas_int = int(df["Visitas Internacionais"].sum())
-    arrecadacao = float(df["Arrecadação"].sum())
-    return total_empregos, qtd_estabelecimentos, visitas_nac, visitas_int, arrecadacao
+def calcula_kpis(cubo):
+    return cubo.kpis()
 
 
-total_empregos, qtd_estabelecimentos, visitas_nac, visitas_int, arrecadacao = calcula_kpis(
-    df_filtrado)
+with cronometro.etapa("kpis"):
+    total_empregos, qtd_estabelecimentos, visitas_nac, visitas_int, arrecadacao = calcula_kpis(cubo)
 
 # ---------- KPIs NA TELA ----------
 c1, c2, c3, c4, c5 = st.columns(5)
@@ -178,7 +376,7 @@ with c1:
     st.markdown(f"""
     <div style="background-color:#1C4D86;padding:16px;border-radius:10px;text-align:center;color:white;">
         <div style="font-size:14px;opacity:0.9">Total de Empregos</div>
-        <div style="font-size:20px;font-weight:700">{f"{total_empregos:,}".replace(',', '.')}</div>
+        <div style="font-size:20px;font-weight:700">{formatar_inteiro(total_empregos)}</div>
     </div>
     """, unsafe_allow_html=True)
 
@@ -186,7 +384,7 @@ with c2:
     st.markdown(f"""
     <div style="background-color:#1C4D86;padding:16px;border-radius:10px;text-align:center;color:white;">
         <div style="font-size:14px;opacity:0.9">Total Estabelecimentos</div>
-        <div style="font-size:20px;font-weight:700">{f"{qtd_estabelecimentos:,}".replace(',', '.')}</div>
+        <div style="font-size:20px;font-weight:700">{formatar_inteiro(qtd_estabelecimentos)}</div>
     </div>
     """, unsafe_allow_html=True)
 
@@ -194,7 +392,7 @@ with c3:
     st.markdown(f"""
     <div style="background-color:#1C4D86;padding:16px;border-radius:10px;text-align:center;color:white;">
         <div style="font-size:14px;opacity:0.9">Visitas Nacionais</div>
-        <div style="font-size:20px;font-weight:700">{f"{visitas_nac:,}".replace(',', '.')}</div>
+        <div style="font-size:20px;font-weight:700">{formatar_inteiro(visitas_nac)}</div>
     </div>
     """, unsafe_allow_html=True)
 
@@ -202,7 +400,7 @@ with c4:
     st.markdown(f"""
     <div style="background-color:#1C4D86;padding:16px;border-radius:10px;text-align:center;color:white;">
         <div style="font-size:14px;opacity:0.9">Visitas Internacionais</div>
-        <div style="font-size:20px;font-weight:700">{f"{visitas_int:,}".replace(',', '.')}</div>
+        <div style="font-size:20px;font-weight:700">{formatar_inteiro(visitas_int)}</div>
     </div>
     """, unsafe_allow_html=True)
 
@@ -210,20 +408,115 @@ with c5:
     st.markdown(f"""
     <div style="background-color:#1C4D86;padding:16px;border-radius:10px;text-align:center;color:white;">
         <div style="font-size:14px;opacity:0.9">Arrecadação</div>
-        <div style="font-size:20px;font-weight:700">{f"R$ {arrecadacao:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')}</div>
+        <div style="font-size:20px;font-weight:700">{formatar_moeda(arrecadacao)}</div>
     </div>
     """, unsafe_allow_html=True)
 
 st.markdown("---")
 
+# ---------- FILA DE RELATÓRIOS ----------
+# Os PDFs são montados num pool de processos compartilhado pelo servidor;
+# a aba acompanha o progresso sem bloquear a sessão. PDFs já gerados para a
+# mesma seleção e versão dos dados são entregues direto do cache.
+@st.cache_resource(show_spinner=False)
+def obter_fila_relatorios():
+    return FilaRelatorios(max_workers=min(2, os.cpu_count() or 1))
+
+
+@st.cache_resource(show_spinner=False)
+def obter_cache_relatorios():
+    return CacheRelatorios(max_bytes=64 * 1024 * 1024)
+
+
+def oferecer_download(pdf_bytes, gerado_em):
+    st.success("PDF gerado com sucesso!")
+    st.download_button(
+        "⬇️ Baixar PDF",
+        pdf_bytes,
+        file_name=f"relatorio_{datetime.fromtimestamp(gerado_em, FUSO_HORARIO).strftime('%Y%m%d_%H%M%S')}.pdf",
+        mime="application/pdf",
+        on_click="ignore"  # baixar o arquivo não reexecuta nada
+    )
+
+
+# Só o acompanhamento de uma tarefa em andamento se reexecuta sozinho (a
+# cada INTERVALO_PROGRESSO segundos). Sem pedido, com o PDF pronto ou com
+# erro, nada roda até o próximo clique. Quando a tarefa termina, uma
+# última execução do app tira o acompanhamento da página, e o navegador
+# para de reexecutá-lo.
+INTERVALO_PROGRESSO = 1
+
+
+@st.fragment(run_every=INTERVALO_PROGRESSO)
+def acompanhar_relatorio(id_tarefa):
+    estado_tarefa = obter_fila_relatorios().estado(id_tarefa)
+    if estado_tarefa["status"] != "executando":
+        st.rerun()
+    st.progress(estado_tarefa["progresso"],
+                text=f"⏳ {estado_tarefa['etapa']}... (tarefa {id_tarefa})")
+
+
+def painel_relatorio():
+    pedido = st.session_state.get("relatorio")
+    if not pedido:
+        return
+
+    em_cache = obter_cache_relatorios().obter(pedido["chave"])
+    if em_cache is not None:
+        oferecer_download(*em_cache)
+        return
+
+    id_tarefa = pedido["tarefa"]
+    estado_tarefa = obter_fila_relatorios().estado(id_tarefa)
+    if estado_tarefa["status"] == "executando":
+        acompanhar_relatorio(id_tarefa)
+    elif estado_tarefa["status"] == "erro":
+        st.error(f"Erro ao gerar o relatório: {estado_tarefa['erro']}")
+    elif estado_tarefa["status"] == "concluida":
+        oferecer_download(*estado_tarefa["resultado"])
+
+
 # ---------- ABAS ----------
-tab1, tab2, tab3 = st.tabs(
-    ["📊 Indicadores do Turismo", "📈 Indicadores de Arrecadação", "📄 Relatório (PDF)"])
+# Cada aba é uma função e só a aba aberta é executada: com
+# on_change="rerun" a troca de aba roda de novo e .open indica qual está
+# selecionada. Gráficos, mapas e malha das outras abas não são montados.
+#
+# As abas ficam num fragmento (painel_abas) e a aba do relatório em outro,
+# aninhado: trocar de aba reexecuta só o painel_abas e o botão do PDF só a
+# seção do relatório. CSS, carga, barra lateral e KPIs rodam apenas quando
+# os filtros mudam. O cubo e a seleção normalizada chegam como argumentos
+# (numa reexecução do fragmento, os da última execução completa).
+
+# ---------- CACHE DE FIGURAS ----------
+# Compartilhado por todas as sessões do processo: uma visão já montada
+# (mesmo gráfico, mesma seleção, mesma versão dos dados) não passa de novo
+# pelo plotly.express. A figura só é montada quando não está no cache.
+@st.cache_resource(show_spinner=False)
+def obter_cache_figuras():
+    return CacheFiguras(max_bytes=128 * 1024 * 1024)
+
+
+def exibir_figura(id_grafico, selecao, montar, detalhe=None):
+    cache = obter_cache_figuras()
+    chave = chave_figura(id_grafico, versao_dados, selecao, detalhe)
+    fig = cache.obter(chave)
+    if fig is None:
+        fig = montar()
+        cache.guardar(chave, fig)
+    st.plotly_chart(fig, width="stretch", key=f"grafico_{id_grafico}")
+
+
+def exibir_mapa(id_grafico, selecao, cubo, montar):
+    caminho, mtime = nivel_malha(len(cubo.municipio))
+    exibir_figura(id_grafico, selecao,
+                  lambda: montar(cubo, carregar_malha(caminho, mtime)),
+                  detalhe=[os.path.basename(caminho), mtime])
+
 
 # ------------------------------------------------------------
 # TAB 1 — TURISMO
 # ------------------------------------------------------------
-with tab1:
+def secao_turismo(cubo, selecao):
     st.subheader("Empregos e Estabelecimentos Turísticos")
     col_left, _, col_right = st.columns([2, 0.1, 2])
 
@@ -235,24 +528,8 @@ with tab1:
             "</h5>",
             unsafe_allow_html=True
         )
-        empre_uf = df_filtrado.groupby(
-            "Estado")[["Empregos"]].sum().reset_index()
-        empre_uf["hover"] = empre_uf["Empregos"].apply(
-            lambda x: f"{x:,.0f}".replace(",", ".") if pd.notna(x) else "0"
-        )
-        fig_barras = px.bar(empre_uf, x="Estado", y="Empregos", height=420
-                            )
-        fig_barras.update_traces(marker=dict(color="#1C4D86"),
-                                 customdata=empre_uf[["hover"]],
-                                 hovertemplate="<b>%{x}</b><br>%{customdata[0]}<extra></extra>"
-                                 )
-        fig_barras.update_layout(
-            plot_bgcolor="rgba(0,0,0,0)",  # fundo da área do gráfico
-            paper_bgcolor="rgba(0,0,0,0)",  # fundo externo
-            yaxis=dict(title=None, tickfont=dict(color="#1A1A1A")),
-            xaxis=dict(title=None, tickfont=dict(color="#1A1A1A"))
-        )
-        st.plotly_chart(fig_barras, use_container_width=True, key="grafico_empregos")
+        with cronometro.etapa("grafico.empregos"):
+            exibir_figura("empregos", selecao, lambda: figura_empregos(cubo))
 
     # Gráfico --> Quantidade de estabelecimentos turísticos por Estado
     with col_right:
@@ -262,23 +539,8 @@ with tab1:
             "</h5>",
             unsafe_allow_html=True
         )
-        estabe_uf = df_filtrado.groupby("Estado", as_index=False)[
-            ["Estabelecimentos"]].sum()
-        estabe_uf["hover"] = estabe_uf["Estabelecimentos"].apply(
-            lambda x: f"{x:,.0f}".replace(",", ".") if pd.notna(x) else "0"
-        )
-        fig_barras_02 = px.bar(estabe_uf, x="Estado", y="Estabelecimentos", height=420
-                               )
-        fig_barras_02.update_traces(marker=dict(color="#1C4D86"),
-                                    customdata=estabe_uf[["hover"]],
-                                    hovertemplate="<b>%{x}</b><br>%{customdata[0]}<extra></extra>"
-                                    )
-        fig_barras_02.update_layout(
-            plot_bgcolor="rgba(0,0,0,0)", paper_bgcolor="rgba(0,0,0,0)",
-            yaxis=dict(title=None, tickfont=dict(color="#1A1A1A")),
-            xaxis=dict(title=None, tickfont=dict(color="#1A1A1A"))
-        )
-        st.plotly_chart(fig_barras_02, use_container_width=True, key="grafico_estabelecimentos" )
+        with cronometro.etapa("grafico.estabelecimentos"):
+            exibir_figura("estabelecimentos", selecao, lambda: figura_estabelecimentos(cubo))
 
     st.markdown("---")
 
@@ -293,47 +555,8 @@ with tab1:
             "</h5>",
             unsafe_allow_html=True
         )
-        visitas = (df_filtrado.groupby("Estado", as_index=False)[["Visitas Nacionais", "Visitas Internacionais"]].sum()
-                   .sort_values(by="Visitas Nacionais", ascending=False)
-                   )
-        ordem_estados = visitas["Estado"].tolist()
-
-        df_long = visitas.melt(id_vars="Estado", var_name="Tipo", value_name="Quantidade"
-                               )
-        df_long["Tipo"] = df_long["Tipo"].str.strip()
-
-        df_long["Tipo"] = pd.Categorical(df_long["Tipo"], categories=["Visitas Internacionais", "Visitas Nacionais"],
-                                         ordered=True
-                                         )
-        df_long["hover"] = df_long["Quantidade"].apply(
-            lambda x: f"{x:,.0f}".replace(",", ".") if pd.notna(x) else "0"
-        )
-        fig_barrasVisitas = px.bar(df_long, x="Quantidade", y="Estado", orientation='h',
-                                   color="Tipo", barmode="group", height=540,
-                                   category_orders={"Tipo": ["Visitas Internacionais", "Visitas Nacionais"],
-                                                    "Estado": ordem_estados},
-                                   color_discrete_map={
-                                       "Visitas Internacionais": "#F5A623", "Visitas Nacionais": "#1C4D86"}
-                                   )
-        fig_barrasVisitas.update_traces(
-            selector=dict(name="Visitas Nacionais"),
-            customdata=df_long[df_long["Tipo"] ==
-                               "Visitas Nacionais"][["hover"]],
-            hovertemplate="<b>%{y}</b><br>%{customdata[0]}<extra></extra>"
-        )
-        fig_barrasVisitas.update_traces(
-            selector=dict(name="Visitas Internacionais"),
-            customdata=df_long[df_long["Tipo"] ==
-                               "Visitas Internacionais"][["hover"]],
-            hovertemplate="<b>%{y}</b><br>%{customdata[0]}<extra></extra>"
-        )
-        fig_barrasVisitas.update_layout(
-            plot_bgcolor="rgba(0,0,0,0)", paper_bgcolor="rgba(0,0,0,0)", legend=dict(traceorder="reversed"),
-            yaxis=dict(title=None, tickfont=dict(color="#1A1A1A")),
-            xaxis=dict(title=None, tickfont=dict(
-                color="#1A1A1A"), showgrid=True)
-        )
-        st.plotly_chart(fig_barrasVisitas, use_container_width=True, key="grafico_visitas")
+        with cronometro.etapa("grafico.visitas"):
+            exibir_figura("visitas", selecao, lambda: figura_visitas(cubo))
 
     # Gráfico --> Visitas por Município
     with col_right:
@@ -343,47 +566,14 @@ with tab1:
             "</h5>",
             unsafe_allow_html=True
         )
-        # Caminho absoluto para o arquivo geojson
-        geojson_path = os.path.join(BASE_DIR, "mapa.json")
-        
-        # Abrir o arquivo com tratamento de erro
-        try:
-            with open(geojson_path, "r", encoding="utf-8") as f:
-                geojson_mapa = json.load(f)
-        except FileNotFoundError:
-            st.error(f"Arquivo 'mapa.json' não encontrado em: {geojson_path}")
-            st.stop()  # Para a execução do app se o arquivo não existir
-        
-        df_filtrado["codigo_ibge"] = df_filtrado["codigo_ibge"].astype(str)
-        df_filtrado["Visitas_hover"] = df_filtrado["Visitas"].apply(
-            lambda x: f" {x:,.0f}".replace(",", ".") if pd.notna(x) else "0"
-        )
-        fig_mapa_02 = px.choropleth_mapbox(
-            df_filtrado,
-            geojson=geojson_mapa,
-            locations="codigo_ibge",
-            featureidkey="properties.id",
-            hover_name="Município",
-            custom_data=["Visitas_hover"],
-            hover_data={"codigo_ibge": False, },  # mostra valor
-            mapbox_style="carto-positron",
-            center={"lat": -10, "lon": -52},
-            zoom=3.3,
-            opacity=0.7,
-            height=520
-        )
-        fig_mapa_02.update_traces(hovertemplate="<b>%{hovertext}</b><br>" +
-                                  "<br>%{customdata[0]}<extra></extra>")
-        fig_mapa_02.update_layout(
-            plot_bgcolor="rgba(0,0,0,0)", paper_bgcolor="rgba(0,0,0,0)",
-            margin={"r": 0, "t": 40, "l": 0, "b": 0}
-        )
-        st.plotly_chart(fig_mapa_02, use_container_width=True, key="grafico_mapa_visitas")
+        with cronometro.etapa("mapa.visitas"):
+            exibir_mapa("mapa_visitas", selecao, cubo, figura_mapa_visitas)
+
 
 # ------------------------------------------------------------
 # TAB 2 — ARRECADAÇÃO
 # ------------------------------------------------------------
-with tab2:
+def secao_arrecadacao(cubo, selecao):
     st.subheader("Arrecadação Turística")
     col_left, _, col_right = st.columns([2, 0.1, 2])
 
@@ -395,25 +585,14 @@ with tab2:
             "</h5>",
             unsafe_allow_html=True
         )
-        arrecadacaoEstado = (df_filtrado.groupby("Estado", as_index=False)["Arrecadação"].sum()
-                             )
-        arrecadacaoEstado["Arrecadacao_hover"] = arrecadacaoEstado["Arrecadação"].apply(
-            lambda x: f"R$ {x:,.0f}".replace(
-                ",", "X").replace(".", ",").replace("X", ".")
-        )
-        fig_linhas = px.line(arrecadacaoEstado, x="Estado", y="Arrecadação", height=520,
-                             color_discrete_sequence=["#F5A623"]
-                             )
-        fig_linhas.update_traces(
-            customdata=arrecadacaoEstado[["Arrecadacao_hover"]],
-            hovertemplate="<b>%{x}</b><br>%{customdata[0]}<extra></extra>"
-        )
-        fig_linhas.update_layout(
-            plot_bgcolor="rgba(0,0,0,0)", paper_bgcolor="rgba(0,0,0,0)",
-            yaxis=dict(title=None, tickfont=dict(color="#1A1A1A")),
-            xaxis=dict(title=None, tickfont=dict(color="#1A1A1A")),
-        )
-        st.plotly_chart(fig_linhas, use_container_width=True, key="grafico_arrecadacao")
+        with cronometro.etapa("grafico.arrecadacao"):
+            # Somas da seleção por ano, em todos os anos do período
+            exibir_figura("arrecadacao", selecao, lambda: figura_evolucao_arrecadacao(
+                consultas.somar(Consulta(selecao, por=["Ano"]))[0]))
+        if len(anos_base) == 1:
+            st.caption("A base tem uma edição só; grave outras com `python ingestao.py` para ver a evolução.")
+        elif len(anos) == 1:
+            st.caption("Escolha mais de um ano na barra lateral para ver a evolução.")
 
     # Gráfico --> Arrecadação por Município
     with col_right:
@@ -423,337 +602,72 @@ with tab2:
             "</h5>",
             unsafe_allow_html=True
         )
-        # Caminho absoluto para o arquivo geojson
-        geojson_path = os.path.join(BASE_DIR, "mapa.json")
-        
-        # Abrir o arquivo com tratamento de erro
-        try:
-            with open(geojson_path, "r", encoding="utf-8") as f:
-                geojson_mapa = json.load(f)
-        except FileNotFoundError:
-            st.error(f"Arquivo 'mapa.json' não encontrado em: {geojson_path}")
-            st.stop()  # Para a execução do app se o arquivo não existir
-            
-        df_filtrado["codigo_ibge"] = df_filtrado["codigo_ibge"].astype(str)
-        df_filtrado["Arrecadacao_hover"] = df_filtrado["Arrecadação"].apply(
-            lambda x: f"R$ {x:,.0f}".replace(
-                ",", ".") if pd.notna(x) else "R$ 0"
-        )
-        fig_mapa_03 = px.choropleth_mapbox(
-            df_filtrado,
-            geojson=geojson_mapa,
-            locations="codigo_ibge",
-            featureidkey="properties.id",
-            hover_name="Município",
-            custom_data=["Arrecadacao_hover"],
-            mapbox_style="carto-positron",
-            center={"lat": -10, "lon": -52},
-            zoom=3.3,
-            opacity=0.7,
-            height=520
-        )
-        fig_mapa_03.update_traces(
-            hovertemplate="<b>%{hovertext}</b><br>" +
-            "<br>%{customdata[0]}<extra></extra>")
-        fig_mapa_03.update_layout(
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            margin={"r": 0, "t": 40, "l": 0, "b": 0}
-        )
-        st.plotly_chart(fig_mapa_03, use_container_width=True, key="grafico_mapa_arrecadacao")
+        with cronometro.etapa("mapa.arrecadacao"):
+            exibir_mapa("mapa_arrecadacao", selecao, cubo, figura_mapa_arrecadacao)
+
 
 # ------------------------------------------------------------
 # TAB 3 — RELATÓRIO PDF
 # ------------------------------------------------------------
-
-with tab3:
+@st.fragment
+@medir_fragmento("relatorio")
+def secao_relatorio(cubo, selecao):
     st.subheader("Gerar Relatório")
-    gerar = st.button("📄 Gerar Relatório em PDF")
+    fila = obter_fila_relatorios()
+    cache_relatorios = obter_cache_relatorios()
+    pedido = st.session_state.get("relatorio")
+    em_andamento = bool(pedido and pedido["tarefa"]) and \
+        fila.estado(pedido["tarefa"])["status"] == "executando"
 
-    if gerar:
-        msg = st.info("⏳ Gerando relatório, por favor aguarde...")
-        try:
-            pio.kaleido.scope.default_format = "png"
-        except:
-            pass
-
-        styles = getSampleStyleSheet()
-        story = []  # story definido aqui, dentro do if
-
-        # ----- TÍTULO PDF -----
-        ibge_path = os.path.join(BASE_DIR, "IBGE.png")
-        if os.path.exists(ibge_path):
-            logo = Image(ibge_path, width=60, height=60)
-            story.append(logo)
-            story.append(Spacer(1, 6))
-
-        story.append(Paragraph(
-            "<b>Painel de Desenvolvimento Econômico e Turístico</b>",
-            styles["Title"]
-        ))
-        
-        agora = datetime.now(ZoneInfo("America/Sao_Paulo"))
-        data_formatada = agora.strftime("%d/%m/%Y %H:%M")
-        styles.add(ParagraphStyle(
-            name="DataDireita",
-            parent=styles["Normal"],
-            fontSize=8,
-            alignment=TA_RIGHT
-        ))
-
-        story.append(Paragraph(
-            f"Gerado em: {data_formatada}", styles["DataDireita"]
-        ))
-        story.append(Spacer(1, 12))
-
-        # ----- TEXTO DE INTRODUÇÃO -----
-        texto_intro = """
-Este relatório foi desenvolvido para fornecer uma visão completa sobre o desempenho dos polos turísticos, empregos, estabelecimentos e o nível de engajamento de visitantes nos municípios.
-A análise utiliza informações reais da base do IBGE, com o objetivo de avaliar tendências, padrões de comportamento e indicadores que influenciam a economia e o turismo local.
-Este relatório apresenta gráficos e análises detalhadas para apoiar decisões estratégicas e políticas públicas.
-"""
-        story.append(Paragraph(texto_intro, styles["Normal"]))
-        story.append(Spacer(1, 18))
-
-        texto_emp = "Os resultados observados indicam diferenças na geração de empregos."
-        texto_est = "A partir das informações levantadas, é possível identificar a quantidade de estabelecimentos turísticos."
-        texto_vis = "As informações disponíveis evidenciam o total de visitas."
-        texto_arr = "Os dados apresentados demonstram os valores de arrecadação registrados."
-
-        texto_kpi = "Os principais indicadores econômicos e turísticos por município são apresentados abaixo:"
-        story.append(Paragraph(texto_kpi, styles["Normal"]))
-        story.append(Spacer(1, 18))
-
-        # ----- KPIs lado a lado -----
-        kpis = [
-            ["Total de Empregos", f"{total_empregos:,}".replace(',', '.')],
-            ["Estabelecimentos", f"{qtd_estabelecimentos:,}".replace(',', '.')],
-            ["Visitas Nacionais", f"{visitas_nac:,}".replace(',', '.')],
-            ["Visitas Internacionais", f"{visitas_int:,}".replace(',', '.')],
-            ["Arrecadação", f"R$ {arrecadacao:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')]
-        ]
-        table_data = [[kpi[0] + "\n" + kpi[1] for kpi in kpis]]
-        t = Table(table_data, colWidths=[1.5*inch]*5, hAlign='CENTER')
-        t.setStyle(TableStyle([
-            ('BACKGROUND', (0,0), (-1,0), colors.HexColor("#1C4D86")),
-            ('TEXTCOLOR', (0,0), (-1,0), colors.white),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('INNERGRID', (0, 0), (-1, -1), 0.5, colors.white)
-        ]))
-        story.append(t)
-        story.append(Spacer(1, 12))
-
-        # ----- DICIONÁRIO DE SIGLAS -----
-        sigla_para_estado = {
-            "AC": "Acre", "AL": "Alagoas", "AP": "Amapá", "AM": "Amazonas",
-            "BA": "Bahia", "CE": "Ceará", "DF": "Distrito Federal", "ES": "Espírito Santo",
-            "GO": "Goiás", "MA": "Maranhão", "MT": "Mato Grosso", "MS": "Mato Grosso do Sul",
-            "MG": "Minas Gerais", "PA": "Pará", "PB": "Paraíba", "PR": "Paraná",
-            "PE": "Pernambuco", "PI": "Piauí", "RJ": "Rio de Janeiro", "RN": "Rio Grande do Norte",
-            "RS": "Rio Grande do Sul", "RO": "Rondônia", "RR": "Roraima", "SC": "Santa Catarina",
-            "SP": "São Paulo", "SE": "Sergipe", "TO": "Tocantins"
-        }
-        
-        # ----- Funções para gerar markdowns -----
-        def gerar_markdown_empregos(df):
-            df_uf = df.groupby("Estado", as_index=False)["Empregos"].sum()
-            markdown = ""
-            for _, row in df_uf.iterrows():
-                sigla = row["Estado"]
-                estado = sigla_para_estado.get(sigla, sigla)
-                empregos = f"{int(row['Empregos']):,}".replace(",", ".")
-                markdown += f"Em **{estado}** foram gerados cerca de **{empregos} empregos**.\n"
-            return markdown
-
-        def gerar_markdown_estabelecimentos(df):
-            df_uf = df.groupby("Estado", as_index=False)["Estabelecimentos"].sum()
-            markdown = ""
-            for _, row in df_uf.iterrows():
-                sigla = row["Estado"]
-                estado = sigla_para_estado.get(sigla, sigla)
-                estabe = f"{int(row['Estabelecimentos']):,}".replace(",", ".")
-                markdown += f"Em {estado}, contabilizam-se aproximadamente {estabe} estabelecimentos turísticos.\n"
-            return markdown
-
-        def gerar_markdown_visitas(df):
-            df_visitas = df.groupby("Estado", as_index=False)[
-                ["Visitas Nacionais", "Visitas Internacionais"]
-            ].sum()
-            markdown = ""
-            for _, row in df_visitas.iterrows():
-                sigla = row["Estado"]
-                estado = sigla_para_estado.get(sigla, sigla)
-                nac = f"{int(row['Visitas Nacionais']):,}".replace(",", ".")
-                intl = f"{int(row['Visitas Internacionais']):,}".replace(",", ".")
-                markdown += f"Em {estado}, contabilizaram-se {nac} visitas nacionais e {intl} visitas internacionais.\n"
-            return markdown
-
-        def gerar_markdown_arrecadacao(df):
-            df_arrec = df.groupby("Estado", as_index=False)["Arrecadação"].sum()
-            markdown = ""
-            for _, row in df_arrec.iterrows():
-                sigla = row["Estado"]
-                estado = sigla_para_estado.get(sigla, sigla)
-                valor = f"R$ {row['Arrecadação']:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-                markdown += f"No estado de {estado}, a arrecadação foi de aproximadamente {valor}.\n"
-            return markdown
-
-        # ----- Gerar markdowns -----
-        markdown_empregos = gerar_markdown_empregos(df_filtrado)
-        markdown_estabelecimentos = gerar_markdown_estabelecimentos(df_filtrado)
-        markdown_visitas = gerar_markdown_visitas(df_filtrado)
-        markdown_arrecadacao = gerar_markdown_arrecadacao(df_filtrado)
-
-        titulo_menor = ParagraphStyle(
-            name="TituloMenor",
-            fontSize=14,
-            leading=16,
-            textColor=colors.black,
-            spaceAfter=10
-        )
+    # Um relatório por sessão de cada vez; os filtros continuam livres
+    # enquanto ele é montado (o relatório usa a seleção do momento do clique)
+    gerar = st.button("📄 Gerar Relatório em PDF", disabled=em_andamento)
 
-        # ----- Função para salvar gráfico e inserir markdown (MATPLOTLIB, sem Kaleido) -----
-        import matplotlib.pyplot as plt
-        import numpy as np
-        
-        def salvar_e_inserir(fig, titulo, descricao, markdown_dinamico=None):
-            story.append(Paragraph(f"<b>{titulo}</b>", titulo_menor))
-            try:
-                tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".png")
-                plt.figure(figsize=(8, 5))
-
-                # Detecta tipo de gráfico Plotly
-                if len(fig.data) == 1:
-                    trace = fig.data[0]
-
-                    if trace.type == "scatter":
-                        plt.plot(trace.x, trace.y, marker='o')
-
-                    elif trace.type == "bar":
-                        # Verifica se é horizontal
-                        if hasattr(trace, "orientation") and trace.orientation == "h":
-                            plt.barh(trace.y, trace.x)
-                        else:
-                            plt.bar(trace.x, trace.y)
-
-                elif len(fig.data) == 2:
-                    trace1 = fig.data[0]
-                    trace2 = fig.data[1]
-
-                    largura = 0.35
-
-                    # Se for gráfico horizontal (caso do gráfico de visitas)
-                    if hasattr(trace1, "orientation") and trace1.orientation == "h":
-                        # Identificar qual trace é Nacional e qual é Internacional
-                        if "Nacional" in trace1.name:
-                            nacional = trace1
-                            internacional = trace2
-                        else:
-                            nacional = trace2
-                            internacional = trace1
-
-                        # Ordenar do maior para o menor (baseado em visitas nacionais)
-                        categorias = list(nacional.y)
-                        valores_nac = list(nacional.x)
-                        valores_int = list(internacional.x)
-
-                        dados = sorted(zip(categorias, valores_nac, valores_int),
-                                       key=lambda x: x[1],
-                                       reverse=True)
-
-                        categorias, valores_nac, valores_int = zip(*dados)
-
-                        pos = np.arange(len(categorias))
-                        largura = 0.35
-
-                        # Azul = Nacional
-                        plt.barh(pos - largura/2, valores_nac, largura,
-                                 label="Visitas Nacionais", color="#1C4D86")
-
-                        # Laranja = Internacional
-                        plt.barh(pos + largura/2, valores_int, largura,
-                                 label="Visitas Internacionais", color="#F5A623")
-
-                        plt.yticks(pos, categorias)
-                        plt.gca().invert_yaxis()
-                    
-                   # Caso seja vertical (empregos e estabelecimentos)
-                    else:
-                        categorias = trace1.x
-                        pos = np.arange(len(categorias))
-
-                        plt.bar(pos - largura/2, trace1.y, largura,
-                                label=trace1.name if trace1.name else "")
-                        plt.bar(pos + largura/2, trace2.y, largura,
-                                label=trace2.name if trace2.name else "")
-
-                        plt.xticks(pos, categorias)
-
-                    plt.legend()
-
-                plt.xticks(rotation=45)
-                plt.tight_layout()
-                plt.savefig(tmp.name, dpi=300)
-                plt.close()
-
-                story.append(Image(tmp.name, width=5*inch, height=3.5*inch))
-                story.append(Spacer(1, 6))
-
-            except Exception as e:
-                story.append(Paragraph(f"Erro ao gerar gráfico: {e}", styles["Normal"]))
-
-            if descricao:
-                story.append(Paragraph(descricao, styles["Normal"]))
-                story.append(Spacer(1, 6))
-
-            if markdown_dinamico:
-                for linha in markdown_dinamico.split("\n"):
-                    if linha.strip():
-                        linha_formatada = linha.replace("**", "")
-                        story.append(Paragraph(linha_formatada, styles["Normal"]))
-                story.append(Spacer(1, 14))
-
-        # ----- Inserir gráficos + markdowns -----
-        salvar_e_inserir(fig_barras, "Quantidade de empregos por Estado",
-                         texto_emp, markdown_empregos)
-        salvar_e_inserir(fig_barras_02, "Quantidade de estabelecimentos turísticos por Estado",
-                         texto_est, markdown_estabelecimentos)
-        salvar_e_inserir(fig_barrasVisitas, "Comparação entre visitas nacionais e internacionais",
-                         texto_vis, markdown_visitas)
-        salvar_e_inserir(fig_linhas, "Evolução da arrecadação turística",
-                         texto_arr, markdown_arrecadacao)
-
-        # ----- Logo e assinatura -----
-        logo_path = os.path.join(BASE_DIR, "logo.png")
-        if os.path.exists(logo_path):
-            logo_final = Image(logo_path, width=60, height=60)
-            assinatura = Table([[ '', logo_final ]], colWidths=[400, 60])
-            assinatura.setStyle(TableStyle([
-                ('VALIGN', (0, 0), (-1, -1), 'BOTTOM'),
-                ('ALIGN', (1, 0), (1, 0), 'RIGHT'),
-                ('ALIGN', (0, 0), (0, 0), 'LEFT')
-            ]))
-            story.append(Spacer(1, 20))
-            story.append(assinatura)
-            story.append(Spacer(1, 20))
-
-        # ----- Gerar PDF -----
-        tmp_pdf = tempfile.NamedTemporaryFile(delete=False, suffix=".pdf")
-        doc = SimpleDocTemplate(tmp_pdf.name, pagesize=A4)
-        doc.build(story)
-
-        with open(tmp_pdf.name, "rb") as f:
-            pdf_bytes = f.read()
-
-        st.success("PDF gerado com sucesso!")
-        st.download_button(
-            "⬇️ Baixar PDF",
-            pdf_bytes,
-            file_name=f"relatorio_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf",
-            mime="application/pdf"
-        )
+    if gerar:
+        with cronometro.etapa("relatorio.pedido"):
+            if pedido and pedido["tarefa"]:
+                fila.descartar(pedido["tarefa"])
+            chave = chave_relatorio(versao_dados, selecao)
+            id_tarefa = None
+            if cache_relatorios.obter(chave) is None:
+                # Importado só aqui: sessões que não pedem PDF nunca carregam
+                # o reportlab
+                from relatorio import gerar_pdf
+
+                # Evolução da arrecadação: as mesmas somas por ano do painel
+                serie_anos = consultas.somar(Consulta(selecao, por=["Ano"]))[0][["Ano", "Arrecadação"]] \
+                    if len(anos) > 1 else None
+                id_tarefa = fila.enviar(
+                    partial(gerar_pdf, versao_dados=versao_dados, serie_anos=serie_anos,
+                            contexto_log={"sessao": sessao_id, "filtros": cardinalidade_filtros}),
+                    cubo.estado, cubo.kpis(),
+                    # Guarda o horário impresso no PDF, não o da chegada ao cache
+                    ao_concluir=lambda resultado, chave=chave: cache_relatorios.guardar(chave, *resultado)
+                )
+            st.session_state["relatorio"] = {"chave": chave, "tarefa": id_tarefa}
+
+    painel_relatorio()
+
+
+@st.fragment
+@medir_fragmento("abas")
+def painel_abas(cubo, selecao):
+    tab1, tab2, tab3 = st.tabs(
+        ["📊 Indicadores do Turismo", "📈 Indicadores de Arrecadação", "📄 Relatório (PDF)"],
+        key="aba", on_change="rerun")
+
+    with tab1:
+        if tab1.open:
+            secao_turismo(cubo, selecao)
+    with tab2:
+        if tab2.open:
+            secao_arrecadacao(cubo, selecao)
+    with tab3:
+        if tab3.open:
+            secao_relatorio(cubo, selecao)
+
+
+painel_abas(cubo, selecao)
 
 # ------------------------------------------------------------
 # Estilo do Dashboard
@@ -801,3 +715,28 @@ footer, .stFooter {
 
 </style>
 """, unsafe_allow_html=True)
+
+# ------------------------------------------------------------
+# Tempos desta execução
+# ------------------------------------------------------------
+registrar("painel", cronometro, sessao=sessao_id, execucao=st.session_state["execucao"],
+          versao_dados=versao_dados, filtros=cardinalidade_filtros)
+
+if modo_debug:
+    with st.expander("⏱️ Tempos desta execução", expanded=False):
+        st.caption(f"Sessão {sessao_id} · execução {st.session_state['execucao']} · "
+                   f"{cronometro.total_ms():.0f} ms no total · {cardinalidade_filtros['linhas']} linhas filtradas")
+        cache_figuras = obter_cache_figuras()
+        st.caption(f"Cache de figuras: {len(cache_figuras)} figuras · "
+                   f"{cache_figuras.total_bytes / 1024 / 1024:.1f} MiB · "
+                   f"{cache_figuras.acertos} acertos / {cache_figuras.falhas} falhas")
+        atualizador = obter_atualizador(file_path)
+        st.caption(f"Base: versão {instantaneo.numero} ({versao_dados}) · publicada às "
+                   f"{datetime.fromtimestamp(instantaneo.publicado_em).strftime('%H:%M:%S')}")
+        if atualizador.ultimo_erro:
+            st.caption(f"Última atualização da planilha falhou ({atualizador.ultimo_erro}); "
+                       "o painel segue com a versão acima.")
+        st.dataframe(
+            [{"Etapa": nome, "ms": round(ms, 1)} for nome, ms in cronometro.etapas.items()],
+            hide_index=True,
+        )
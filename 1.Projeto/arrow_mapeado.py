@@ -0,0 +1,64 @@
+# ============================
+# arrow_mapeado.py — Arquivos Arrow compartilhados entre processos
+# ============================
+
+# ---------- IMPORTS ----------
+import json
+import os
+
+# ---------- ARQUIVO ARROW MAPEADO ----------
+# Formato Arrow IPC sem compressão: o arquivo em disco tem o mesmo layout
+# das colunas na memória. Cada processo mapeia o arquivo só para leitura
+# (mmap) e as colunas apontam direto para as páginas do arquivo, que o
+# sistema operacional guarda uma vez só no page cache e divide entre
+# todas as réplicas do painel. Nada é copiado para a memória do processo
+# até que alguma etapa precise (um filtro, por exemplo, copia só as
+# linhas selecionadas).
+#
+# A origem (assinatura do arquivo que gerou o Arrow) fica nos metadados
+# do schema, como no cache Parquet da planilha (dados.py).
+
+CHAVE_ORIGEM = b"painel_origem"
+
+
+def gravar(tabela, caminho, origem):
+    import pyarrow as pa
+
+    metadados = dict(tabela.schema.metadata or {})
+    metadados[CHAVE_ORIGEM] = json.dumps(origem).encode("utf-8")
+    tabela = tabela.replace_schema_metadata(metadados)
+
+    # Arquivo temporário e troca de uma vez: outro processo nunca mapeia
+    # um arquivo pela metade, e quem já mapeou o anterior continua lendo
+    # a versão antiga até recarregar
+    os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+    tmp = f"{caminho}.{os.getpid()}.tmp"
+    with pa.OSFile(tmp, "wb") as arquivo, pa.ipc.new_file(arquivo, tabela.schema) as escritor:
+        escritor.write_table(tabela)
+    os.replace(tmp, caminho)
+
+
+def mapear(caminho):
+    # pyarrow.Table cujas colunas são vistas do arquivo mapeado
+    import pyarrow as pa
+
+    return pa.ipc.open_file(pa.memory_map(caminho, "r")).read_all()
+
+
+def origem(caminho):
+    # Origem gravada no arquivo, ou None se ele não existir ou for ilegível
+    import pyarrow as pa
+
+    try:
+        leitor = pa.ipc.open_file(pa.memory_map(caminho, "r"))
+    except (OSError, pa.ArrowInvalid):
+        return None
+    bruto = (leitor.schema.metadata or {}).get(CHAVE_ORIGEM)
+    return json.loads(bruto) if bruto else None
+
+
+def para_pandas(tabela):
+    # Colunas numéricas sem nulos e textos viram vistas do arquivo (sem
+    # cópia); só os códigos das categorias são materializados. As vistas
+    # são somente leitura: os dados não podem ser alterados in-place.
+    return tabela.to_pandas(split_blocks=True, self_destruct=False)
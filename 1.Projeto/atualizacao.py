@@ -0,0 +1,172 @@
+# ============================
+# atualizacao.py — Atualização da base sem reiniciar o painel
+# ============================
+#
+# Uma thread observa a planilha.xlsx e as partições de dados/. Quando algo
+# muda, monta em segundo plano um instantâneo novo da base (leitura e
+# normalização da planilha, índice dos filtros e cubo da seleção inicial)
+# e só então o publica, de uma vez, com um número de versão. Cada execução
+# do script pega o instantâneo atual no início e o usa até o fim: quem
+# estava no meio de uma execução termina com os dados antigos. Os caches
+# de figuras, agregações e relatórios têm a versão dos dados na chave,
+# então nada calculado sobre o instantâneo anterior é reaproveitado.
+
+# ---------- IMPORTS ----------
+import os
+import shutil
+import threading
+import time
+
+from dados import anos_disponiveis, caminho_particao, combinar_versoes, ingerir, versao_particao
+from medicao import Cronometro, registrar
+
+# Instantâneos que não são o atual nem o anterior são apagados depois
+# desse tempo (outra réplica do painel pode ainda estar usando)
+IDADE_MINIMA_LIMPEZA = 600
+
+
+# ---------- INSTANTÂNEO ----------
+# Cópia imutável das partições num momento: dados/instantaneos/<versão>/
+# tem o mesmo formato de dados/ (ano=AAAA/dados.parquet), com links para
+# os arquivos das partições. Uma planilha nova grava outra partição (outro
+# arquivo, via os.replace), e os links continuam apontando para a antiga.
+# O nome da pasta é a versão do conteúdo, então as réplicas que observam
+# a mesma base chegam à mesma pasta e dividem os arquivos mapeados.
+
+class Instantaneo:
+    def __init__(self, numero, pasta, versoes):
+        self.numero = numero
+        self.pasta = pasta
+        self.versoes = versoes
+        self.anos = sorted(versoes)
+        self.versao = combinar_versoes(versoes)
+        self.publicado_em = time.time()
+
+    def versao_anos(self, anos):
+        return combinar_versoes({ano: self.versoes[ano] for ano in anos})
+
+
+def _vincular(origem, destino):
+    try:
+        os.link(origem, destino)
+    except OSError:
+        # Sistema de arquivos sem hard link: copia
+        shutil.copyfile(origem, destino)
+
+
+def criar_instantaneo(pasta, numero):
+    pasta_instantaneos = os.path.join(pasta, "instantaneos")
+    tmp = os.path.join(pasta_instantaneos, f".{os.getpid()}.{threading.get_ident()}.tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    for ano in anos_disponiveis(pasta):
+        destino = caminho_particao(tmp, ano)
+        os.makedirs(os.path.dirname(destino))
+        _vincular(caminho_particao(pasta, ano), destino)
+
+    # Versões lidas dos próprios links: batem com o conteúdo mesmo que uma
+    # partição tenha sido trocada durante a cópia
+    versoes = {ano: versao_particao(tmp, ano) for ano in anos_disponiveis(tmp)}
+    if not versoes:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise ValueError(f"Nenhuma partição em {pasta}")
+    final = os.path.join(pasta_instantaneos, combinar_versoes(versoes))
+    try:
+        os.rename(tmp, final)
+    except OSError:
+        # Já existe (outra réplica ou uma execução anterior chegou antes)
+        shutil.rmtree(tmp, ignore_errors=True)
+    return Instantaneo(numero, final, versoes)
+
+
+# ---------- ATUALIZADOR ----------
+# preparar(instantaneo) aquece os caches do painel (dados, índice e cubo
+# da seleção inicial) antes da troca, para que a primeira execução depois
+# dela não pague a carga. Um erro na planilha nova (arquivo pela metade,
+# coluna faltando) mantém o instantâneo atual e fica em ultimo_erro.
+
+class AtualizadorBase:
+    def __init__(self, caminho_planilha, ano, pasta, preparar=None, intervalo=2.0):
+        self.caminho_planilha = caminho_planilha
+        self.ano = ano
+        self.pasta = pasta
+        self.preparar = preparar
+        self.intervalo = intervalo
+        self.ultimo_erro = None
+        self._anterior = None
+        self._lock = threading.Lock()
+        self._parar = threading.Event()
+
+        # O primeiro instantâneo é montado aqui mesmo: sem ele não há o
+        # que mostrar
+        self._assinatura = self._assinatura_atual()
+        ingerir(caminho_planilha, ano, pasta)
+        self._atual = criar_instantaneo(pasta, 1)
+        self._thread = threading.Thread(target=self._observar, name="atualizador-base", daemon=True)
+        self._thread.start()
+
+    def atual(self):
+        return self._atual
+
+    def _assinatura_atual(self):
+        # Muda quando a planilha ou qualquer partição (ingestao.py) muda
+        def stat(caminho):
+            try:
+                s = os.stat(caminho)
+            except FileNotFoundError:
+                return None
+            return s.st_mtime_ns, s.st_size
+
+        particoes = tuple((ano, stat(caminho_particao(self.pasta, ano))) for ano in anos_disponiveis(self.pasta))
+        return stat(self.caminho_planilha), particoes
+
+    def _observar(self):
+        while not self._parar.wait(self.intervalo):
+            assinatura = self._assinatura_atual()
+            if assinatura != self._assinatura:
+                self._assinatura = assinatura
+                self.atualizar()
+
+    def atualizar(self):
+        # Monta e publica um instantâneo novo; retorna o instantâneo atual
+        with self._lock:
+            cronometro = Cronometro()
+            atual = self._atual
+            try:
+                with cronometro.etapa("atualizacao.ingestao"):
+                    ingerir(self.caminho_planilha, self.ano, self.pasta)
+                with cronometro.etapa("atualizacao.instantaneo"):
+                    novo = criar_instantaneo(self.pasta, atual.numero + 1)
+                if novo.versao == atual.versao:
+                    # Arquivo regravado sem mudar o conteúdo
+                    return atual
+                if self.preparar is not None:
+                    with cronometro.etapa("atualizacao.preparo"):
+                        self.preparar(novo)
+            except Exception as erro:
+                self.ultimo_erro = f"{type(erro).__name__}: {erro}"
+                registrar("atualizacao", cronometro, erro=self.ultimo_erro, versao_dados=atual.versao)
+                return atual
+
+            # Troca: uma atribuição só, vista inteira pelas próximas execuções
+            self._anterior, self._atual = atual, novo
+            self.ultimo_erro = None
+            registrar("atualizacao", cronometro, numero=novo.numero, versao_dados=novo.versao)
+            self._limpar()
+            return novo
+
+    def _limpar(self):
+        # Mantém o instantâneo atual e o anterior (execuções em andamento)
+        pasta_instantaneos = os.path.join(self.pasta, "instantaneos")
+        manter = {os.path.basename(self._atual.pasta), os.path.basename(self._anterior.pasta)}
+        limite = time.time() - IDADE_MINIMA_LIMPEZA
+        for nome in os.listdir(pasta_instantaneos):
+            caminho = os.path.join(pasta_instantaneos, nome)
+            try:
+                antigo = os.path.getmtime(caminho) < limite
+            except OSError:
+                continue
+            if nome not in manter and antigo:
+                shutil.rmtree(caminho, ignore_errors=True)
+
+    def parar(self):
+        self._parar.set()
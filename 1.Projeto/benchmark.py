@@ -0,0 +1,398 @@
+# ============================
+# benchmark.py — Medição de cada etapa do painel em dados sintéticos
+# ============================
+#
+# Gera bases sintéticas com o esquema da planilha.xlsx em 1×, 10× e 100×
+# o número de linhas atual e mede, separadamente, cada etapa que o painel
+# e o relatório executam: carga, filtros da barra lateral, agregação,
+# calcula_kpis, montagem e serialização de cada figura, textos do
+# relatório e o PDF completo, além do tempo de importação dos módulos do
+# app.py num processo novo. O resultado vai para um JSON, que pode ser
+# comparado com o de outro commit.
+#
+#   python benchmark.py                              # 1×, 10× e 100×
+#   python benchmark.py --fatores 1 10 --repeticoes 5
+#   python benchmark.py --comparar benchmarks/anterior.json
+#   python benchmark.py --so-importacao              # só as importações
+
+# ---------- IMPORTS ----------
+import argparse
+import ast
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import graficos
+import relatorio
+from agregacao import CuboAgregado
+from consultas import Consulta, ConsultasDuckDB, ConsultasPandas
+from dados import caminho_particao, carregar_anos, carregar_mapeado, memoria, normalizar
+from filtros import IndiceFiltros, SelecaoMunicipios
+from geometria import MalhaMunicipal, caminho_nivel, escolher_nivel
+from narrativa import Narrativa
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Acima desta razão (mediana atual / mediana de referência) a etapa é
+# apontada como regressão na comparação. Etapas de poucos milissegundos
+# oscilam muito, então a diferença também precisa passar do mínimo.
+LIMITE_REGRESSAO = 1.2
+DIFERENCA_MINIMA_MS = 5.0
+
+
+# ---------- BASE SINTÉTICA ----------
+# Cada réplica da planilha vira um novo conjunto de municípios (nome e
+# código IBGE próprios) nos mesmos Estados e Regiões Turísticas, com as
+# métricas sorteadas em torno dos valores originais.
+
+METRICAS_SORTEADAS = ["Empregos", "Estabelecimentos", "Visitas Nacionais",
+                      "Visitas Internacionais", "Arrecadação"]
+
+# Os códigos IBGE reais têm 7 dígitos; cada réplica soma um múltiplo disto
+DESLOCAMENTO_CODIGO = 10_000_000
+
+
+def gerar_sintetico(base, fator, semente=0):
+    # base: planilha como lida pelo pd.read_excel (antes da normalização)
+    rng = np.random.default_rng(semente)
+    partes = []
+    for replica in range(fator):
+        parte = base.copy()
+        if replica:
+            parte["Município"] = parte["Município"] + f" ({replica})"
+            parte["codigo_ibge"] = parte["codigo_ibge"] + replica * DESLOCAMENTO_CODIGO
+        for metrica in METRICAS_SORTEADAS:
+            escala = rng.uniform(0.5, 1.5, len(parte))
+            parte[metrica] = np.rint(parte[metrica] * escala).astype("int64")
+        parte["Visitas"] = parte["Visitas Nacionais"] + parte["Visitas Internacionais"]
+        partes.append(parte)
+    return pd.concat(partes, ignore_index=True)
+
+
+def malha_sintetica(malha, fator):
+    # Repete as geometrias com os códigos das réplicas (a geometria é
+    # compartilhada, só properties.id muda)
+    features = list(malha.features.values())
+    for replica in range(1, fator):
+        for feature in malha.features.values():
+            codigo = int(feature["properties"]["id"]) + replica * DESLOCAMENTO_CODIGO
+            features.append({**feature, "properties": {**feature["properties"], "id": str(codigo)}})
+    return MalhaMunicipal({"type": "FeatureCollection", "features": features})
+
+
+# ---------- MEDIÇÃO ----------
+
+def medir(funcao, repeticoes):
+    # Retorna (último resultado, tempos em ms)
+    amostras = []
+    resultado = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        amostras.append((time.perf_counter() - inicio) * 1000)
+    return resultado, amostras
+
+
+def _resumo(amostras):
+    return {
+        "mediana_ms": round(statistics.median(amostras), 3),
+        "min_ms": round(min(amostras), 3),
+        "amostras_ms": [round(a, 3) for a in amostras],
+    }
+
+
+def medir_tamanho(base, fator, repeticoes, caminho_mapa):
+    etapas = {}
+
+    def etapa(nome, funcao, vezes=repeticoes):
+        resultado, amostras = medir(funcao, vezes)
+        etapas[nome] = _resumo(amostras)
+        return resultado
+
+    bruto = gerar_sintetico(base, fator)
+
+    # ----- CARGA -----
+    df = etapa("carga.normalizacao", lambda: normalizar(bruto))
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho_parquet = os.path.join(pasta, "planilha.parquet")
+        df.to_parquet(caminho_parquet)
+        df = etapa("carga.parquet", lambda: pd.read_parquet(caminho_parquet))
+
+    # ----- FILTROS DA BARRA LATERAL -----
+    indice = etapa("filtro.indice", lambda: IndiceFiltros(df))
+
+    # Mesmo caminho da barra lateral: município em "Todos" e todas as
+    # regiões dos Estados marcados
+    def filtrar(estados):
+        municipios = SelecaoMunicipios()
+        regioes = indice.opcoes_regiao(estados, municipios)
+        return indice.filtrar(df, estados, municipios, regioes)
+
+    maior_estado = max(indice.linhas_estado, key=lambda e: len(indice.linhas_estado[e]))
+    etapa("filtro.um_estado", lambda: filtrar([maior_estado]))
+    df_filtrado = etapa("filtro.todos", lambda: filtrar(indice.estados))
+
+    # ----- AGREGAÇÃO E KPIs -----
+    cubo = etapa("agregacao.cubo", lambda: CuboAgregado(df_filtrado))
+    kpis = etapa("calcula_kpis", cubo.kpis)
+
+    # ----- BACKENDS DE CONSULTA -----
+    # Filtro e somas por município numa só consulta (consultas.py), como o
+    # painel faz. DuckDB só é medido se estiver instalado.
+    def selecao(estados):
+        municipios = SelecaoMunicipios()
+        return indice.selecao_normalizada(estados, municipios, indice.opcoes_regiao(estados, municipios))
+
+    selecoes = {"um_estado": selecao([maior_estado]), "todos": selecao(indice.estados)}
+    pandas_consultas = ConsultasPandas(df)
+    for nome, sel in selecoes.items():
+        etapa(f"consulta.pandas.{nome}", lambda: pandas_consultas.cubo(sel))
+    try:
+        import duckdb  # noqa: F401
+    except ImportError:
+        duckdb = None
+    if duckdb is not None:
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho_parquet = os.path.join(pasta, "planilha.parquet")
+            df.to_parquet(caminho_parquet)
+            duckdb_consultas = ConsultasDuckDB(caminho_parquet)
+            for nome, sel in selecoes.items():
+                etapa(f"consulta.duckdb.{nome}", lambda: duckdb_consultas.cubo(sel))
+
+    # ----- BASE POR ANO -----
+    # A mesma base gravada como três edições (partições ano=AAAA): carga
+    # do último ano e do intervalo todo, e a série anual do gráfico de
+    # evolução da arrecadação
+    anos = [2018, 2019, 2021]
+    with tempfile.TemporaryDirectory() as pasta:
+        for ano in anos:
+            caminho = caminho_particao(pasta, ano)
+            os.makedirs(os.path.dirname(caminho))
+            df.assign(Ano=np.int16(ano)).to_parquet(caminho)
+        etapa("carga.um_ano", lambda: carregar_anos(pasta, anos[-1:]))
+        df_anos = etapa("carga.todos_anos", lambda: carregar_anos(pasta, anos))
+        # Arquivo Arrow mapeado (o que cada réplica do painel faz depois
+        # que o primeiro processo gravou o arquivo)
+        carregar_mapeado(pasta, anos[-1:], "benchmark")
+        etapa("carga.mapeado", lambda: carregar_mapeado(pasta, anos[-1:], "benchmark"))
+    anos_consultas = ConsultasPandas(df_anos)
+    serie, _ = etapa("consulta.pandas.serie_anos",
+                     lambda: anos_consultas.somar(Consulta(selecoes["todos"], por=["Ano"])))
+    del anos_consultas, df_anos
+
+    # ----- FIGURAS DO PAINEL -----
+    # Montagem (plotly.express) e serialização (o que o st.plotly_chart
+    # envia ao navegador) medidas em separado
+    figuras = {
+        "empregos": lambda: graficos.figura_empregos(cubo),
+        "estabelecimentos": lambda: graficos.figura_estabelecimentos(cubo),
+        "visitas": lambda: graficos.figura_visitas(cubo),
+        "arrecadacao": lambda: graficos.figura_evolucao_arrecadacao(serie),
+    }
+    if os.path.exists(caminho_mapa):
+        caminho = caminho_nivel(caminho_mapa, escolher_nivel(graficos.ZOOM_MAPA, len(cubo.municipio)))
+        if not os.path.exists(caminho):
+            caminho = caminho_mapa
+        malha = malha_sintetica(MalhaMunicipal.de_arquivo(caminho), fator)
+        figuras["mapa_visitas"] = lambda: graficos.figura_mapa_visitas(cubo, malha)
+        figuras["mapa_arrecadacao"] = lambda: graficos.figura_mapa_arrecadacao(cubo, malha)
+
+    tamanhos_json = {}
+    for nome, montar in figuras.items():
+        figura = etapa(f"figura.{nome}", montar)
+        texto = etapa(f"serializacao.{nome}", figura.to_json)
+        tamanhos_json[nome] = len(texto)
+
+    # ----- RELATÓRIO -----
+    def narrativa():
+        texto = Narrativa(cubo.estado)
+        return [texto.frases(chave) + texto.destaques(chave) for chave, *_ in relatorio.GRAFICOS]
+
+    etapa("narrativa", narrativa)
+    pdf, _ = etapa("pdf", lambda: relatorio.gerar_pdf(cubo.estado, kpis, paralelo=False),
+                vezes=max(1, min(repeticoes, 3)))
+
+    return {
+        "fator": fator,
+        "linhas": len(df),
+        "municipios": len(cubo.municipio),
+        "memoria_bytes": memoria(df),
+        "json_figuras_bytes": tamanhos_json,
+        "pdf_bytes": len(pdf),
+        "etapas": etapas,
+    }
+
+
+def aquecer(base):
+    # Importações tardias do plotly/reportlab e caches internos ficam fora
+    # da primeira medição
+    cubo = CuboAgregado(normalizar(base))
+    graficos.figura_empregos(cubo).to_json()
+    relatorio.gerar_pdf(cubo.estado, cubo.kpis(), paralelo=False)
+
+
+# ---------- IMPORTAÇÃO ----------
+# O que todo processo novo do painel paga antes da primeira execução: as
+# importações do topo do app.py, medidas com python -X importtime num
+# processo limpo. Cada módulo importado pelo app.py aparece com o tempo
+# acumulado (ele e tudo o que ele importa pela primeira vez).
+
+def modulos_do_painel():
+    with open(os.path.join(BASE_DIR, "app.py"), encoding="utf-8") as arquivo:
+        arvore = ast.parse(arquivo.read())
+    modulos = []
+    for no in arvore.body:
+        if isinstance(no, ast.Import):
+            modulos.extend(alias.name for alias in no.names)
+        elif isinstance(no, ast.ImportFrom) and no.module and not no.level:
+            modulos.append(no.module)
+    return list(dict.fromkeys(modulos))
+
+
+def medir_importacao(repeticoes):
+    modulos = modulos_do_painel()
+    raizes = {modulo.split(".")[0] for modulo in modulos}
+    comando = [sys.executable, "-X", "importtime", "-c", "import " + ", ".join(modulos)]
+    amostras = {}
+    for _ in range(repeticoes):
+        saida = subprocess.run(comando, cwd=BASE_DIR, capture_output=True, text=True, check=True).stderr
+        total = 0.0
+        for linha in saida.splitlines():
+            # "import time:  self | cumulativo | nome"; o nível de cima tem
+            # um espaço só antes do nome
+            if not linha.startswith("import time:") or "cumulative" in linha:
+                continue
+            _, cumulativo, nome = linha.split("|")
+            if nome.startswith("  ") or nome.strip() not in raizes:
+                continue
+            ms = int(cumulativo) / 1000
+            amostras.setdefault(f"importacao.{nome.strip()}", []).append(ms)
+            total += ms
+        amostras.setdefault("importacao.total", []).append(total)
+    return {"modulos": modulos, "etapas": {nome: _resumo(valores) for nome, valores in amostras.items()}}
+
+
+def _mostrar_importacao(importacao):
+    etapas = sorted(importacao["etapas"].items(), key=lambda item: -item[1]["mediana_ms"])
+    for nome, etapa in etapas:
+        print(f"      {nome:<30} {etapa['mediana_ms']:10.2f} ms")
+
+
+# ---------- AMBIENTE ----------
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _ambiente():
+    import plotly
+    import reportlab
+
+    return {
+        "commit": _commit(),
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "cpus": os.cpu_count(),
+        "versoes": {"pandas": pd.__version__, "numpy": np.__version__,
+                    "plotly": plotly.__version__, "reportlab": reportlab.Version},
+    }
+
+
+# ---------- COMPARAÇÃO ----------
+
+def comparar(atual, referencia):
+    # Retorna a lista de (tamanho, etapa, razão) acima do LIMITE_REGRESSAO
+    # e imprime a tabela completa
+    regressoes = []
+    print(f"\nComparação com {referencia['ambiente'].get('commit')} ({referencia['ambiente'].get('data')})")
+    grupos = dict(atual["tamanhos"])
+    grupos_referencia = dict(referencia["tamanhos"])
+    if "importacao" in atual and "importacao" in referencia:
+        grupos["import"] = atual["importacao"]
+        grupos_referencia["import"] = referencia["importacao"]
+    for tamanho, resultado in grupos.items():
+        anterior = grupos_referencia.get(tamanho)
+        if anterior is None:
+            continue
+        for nome, medida in resultado["etapas"].items():
+            antes = anterior["etapas"].get(nome)
+            if antes is None or antes["mediana_ms"] == 0:
+                continue
+            razao = medida["mediana_ms"] / antes["mediana_ms"]
+            regrediu = (razao > LIMITE_REGRESSAO
+                        and medida["mediana_ms"] - antes["mediana_ms"] > DIFERENCA_MINIMA_MS)
+            marca = "  ← regressão" if regrediu else ""
+            print(f"{tamanho:>5} {nome:<30} {antes['mediana_ms']:10.2f} → {medida['mediana_ms']:10.2f} ms"
+                  f" ({razao:5.2f}×){marca}")
+            if marca:
+                regressoes.append((tamanho, nome, razao))
+    return regressoes
+
+
+# ---------- LINHA DE COMANDO ----------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mede cada etapa do painel em bases sintéticas.")
+    parser.add_argument("--planilha", default=os.path.join(BASE_DIR, "planilha.xlsx"))
+    parser.add_argument("--mapa", default=os.path.join(BASE_DIR, "mapa.json"))
+    parser.add_argument("--fatores", type=int, nargs="+", default=[1, 10, 100],
+                        help="múltiplos do número de linhas da planilha")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--saida", default=None,
+                        help="arquivo JSON (padrão: benchmarks/<data>_<commit>.json)")
+    parser.add_argument("--comparar", metavar="JSON",
+                        help="resultado anterior para comparar as medianas")
+    parser.add_argument("--so-importacao", action="store_true",
+                        help="mede só as importações do app.py (sem as bases sintéticas)")
+    args = parser.parse_args(argv)
+
+    resultado = {"ambiente": _ambiente(), "tamanhos": {}}
+    print("importação ...", flush=True)
+    resultado["importacao"] = medir_importacao(args.repeticoes)
+    _mostrar_importacao(resultado["importacao"])
+
+    fatores = [] if args.so_importacao else args.fatores
+    if fatores:
+        base = pd.read_excel(args.planilha)
+        aquecer(base)
+    for fator in fatores:
+        print(f"{fator}× ...", flush=True)
+        medida = medir_tamanho(base, fator, args.repeticoes, args.mapa)
+        resultado["tamanhos"][f"{fator}x"] = medida
+        for nome, etapa in medida["etapas"].items():
+            print(f"{fator:>4}× {nome:<30} {etapa['mediana_ms']:10.2f} ms")
+
+    saida = args.saida
+    if saida is None:
+        momento = datetime.now().strftime("%Y%m%d_%H%M%S")
+        saida = os.path.join(BASE_DIR, "benchmarks", f"{momento}_{resultado['ambiente']['commit'] or 'sem_git'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(saida)), exist_ok=True)
+    with open(saida, "w", encoding="utf-8") as arquivo:
+        json.dump(resultado, arquivo, ensure_ascii=False, indent=2)
+    print(f"\nResultado gravado em {saida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as arquivo:
+            regressoes = comparar(resultado, json.load(arquivo))
+        if regressoes:
+            print(f"\n{len(regressoes)} etapa(s) acima de {LIMITE_REGRESSAO}× a referência", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+# ============================
+# cache_figuras.py — Cache das figuras Plotly do painel
+# ============================
+
+# ---------- IMPORTS ----------
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+import plotly.graph_objects as go
+
+
+# ---------- CHAVE ----------
+# Uma figura depende do gráfico, da seleção de filtros (normalizada, ver
+# IndiceFiltros.selecao_normalizada) e da versão dos dados. Nos mapas,
+# detalhe identifica o arquivo da malha usado (nível de simplificação).
+
+def chave_figura(id_grafico, versao_dados, selecao, detalhe=None):
+    conteudo = json.dumps({"grafico": id_grafico, "versao": versao_dados,
+                           "selecao": selecao, "detalhe": detalhe},
+                          sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(conteudo.encode("utf-8")).hexdigest()
+
+
+# ---------- CACHE LRU ----------
+# Guarda a figura serializada (JSON em bytes): o tamanho contado é o real
+# e cada acerto devolve uma figura nova, que a sessão pode alterar sem
+# afetar as outras. A figura guardada já foi validada pelo Plotly quando
+# foi montada, então a reconstrução pula a validação (bem mais rápida que
+# montar de novo com plotly.express). Limitado pelo total de bytes; ao
+# passar do limite saem as figuras usadas há mais tempo.
+
+class CacheFiguras:
+    def __init__(self, max_bytes=128 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.acertos = 0
+        self.falhas = 0
+        self._itens = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obter(self, chave):
+        # Retorna uma go.Figure ou None
+        with self._lock:
+            texto = self._itens.get(chave)
+            if texto is None:
+                self.falhas += 1
+                return None
+            self._itens.move_to_end(chave)
+            self.acertos += 1
+        return go.Figure(json.loads(texto), _validate=False)
+
+    def guardar(self, chave, figura):
+        texto = figura.to_json().encode("utf-8")
+        if len(texto) > self.max_bytes:
+            return
+        with self._lock:
+            antigo = self._itens.pop(chave, None)
+            if antigo is not None:
+                self.total_bytes -= len(antigo)
+            self._itens[chave] = texto
+            self.total_bytes += len(texto)
+            while self.total_bytes > self.max_bytes:
+                _, removido = self._itens.popitem(last=False)
+                self.total_bytes -= len(removido)
+
+    def __len__(self):
+        return len(self._itens)
@@ -0,0 +1,63 @@
+# ============================
+# cache_relatorios.py — Cache dos PDFs gerados
+# ============================
+
+# ---------- IMPORTS ----------
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from zoneinfo import ZoneInfo
+
+
+# ---------- CHAVE ----------
+# O relatório depende só da seleção de filtros (normalizada, ver
+# IndiceFiltros.selecao_normalizada) e da versão dos dados. O horário de
+# geração não entra na chave: ele é guardado junto com o PDF e mostrado
+# como "Gerado em" do relatório original.
+
+# Fuso do horário de geração: o "Gerado em" impresso no PDF e o nome do
+# arquivo baixado mostram o mesmo instante
+FUSO_HORARIO = ZoneInfo("America/Sao_Paulo")
+
+def chave_relatorio(versao_dados, selecao):
+    conteudo = json.dumps({"versao": versao_dados, "selecao": selecao},
+                          sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(conteudo.encode("utf-8")).hexdigest()
+
+
+# ---------- CACHE LRU ----------
+# Limitado pelo total de bytes; ao passar do limite saem os PDFs usados
+# há mais tempo.
+
+class CacheRelatorios:
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._itens = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obter(self, chave):
+        # Retorna (pdf_bytes, gerado_em) ou None
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is not None:
+                self._itens.move_to_end(chave)
+            return item
+
+    def guardar(self, chave, pdf_bytes, gerado_em=None):
+        if len(pdf_bytes) > self.max_bytes:
+            return
+        with self._lock:
+            antigo = self._itens.pop(chave, None)
+            if antigo is not None:
+                self.total_bytes -= len(antigo[0])
+            self._itens[chave] = (pdf_bytes, gerado_em or time.time())
+            self.total_bytes += len(pdf_bytes)
+            while self.total_bytes > self.max_bytes:
+                _, (removido, _) = self._itens.popitem(last=False)
+                self.total_bytes -= len(removido)
+
+    def __len__(self):
+        return len(self._itens)
@@ -0,0 +1,184 @@
+# ============================
+# consultas.py — Filtros e somas do painel como consultas declarativas
+# ============================
+#
+# Cada pedido aos dados é uma Consulta: a seleção de filtros normalizada
+# (IndiceFiltros.selecao_normalizada, "*" = sem restrição) e as dimensões
+# do agrupamento; as métricas são sempre somadas. Quem executa é um
+# backend trocável:
+#
+#   ConsultasPandas  — DataFrame em memória e posições do IndiceFiltros
+#                      (comportamento original do painel)
+#   ConsultasDuckDB  — DuckDB embutido lendo o Parquet da planilha; os
+#                      filtros de Estado/Município/Região viram WHERE e
+#                      são aplicados na leitura do arquivo (pushdown)
+#
+# O CuboAgregado sai de uma única consulta por município; KPIs, somas por
+# Estado (gráficos e textos do relatório) e por Região derivam dele.
+
+# ---------- IMPORTS ----------
+import pandas as pd
+
+from agregacao import DIMENSOES, METRICAS, CuboAgregado, somar
+from filtros import EXCLUIR, IndiceFiltros
+
+BACKENDS = ("pandas", "duckdb")
+
+# Coluna da seleção normalizada -> coluna dos dados
+COLUNAS_FILTRO = {"estados": "Estado", "municipios": "Município", "regioes": "Região Turística",
+                  "anos": "Ano"}
+
+
+# ---------- CONSULTA ----------
+# selecao pode trazer também "anos" (base por ano, ver dados.py); sem a
+# chave, todas as linhas carregadas entram.
+
+class Consulta:
+    def __init__(self, selecao, por=DIMENSOES):
+        self.selecao = selecao
+        self.por = list(por)
+
+
+# ---------- BACKEND PANDAS ----------
+
+class ConsultasPandas:
+    nome = "pandas"
+
+    def __init__(self, df):
+        self.df = df
+        self.indice = IndiceFiltros(df)
+
+    def somar(self, consulta):
+        # Retorna (uma linha por grupo com as colunas de consulta.por e as
+        # somas das METRICAS, quantas linhas dos dados entraram)
+        recorte = self.indice.filtrar_selecao(self.df, consulta.selecao)
+        return somar(recorte, consulta.por).reset_index(), len(recorte)
+
+    def cubo(self, selecao):
+        return CuboAgregado(self.indice.filtrar_selecao(self.df, selecao))
+
+
+# ---------- BACKEND DUCKDB ----------
+# Opcional (pip install duckdb). Os dados não ficam num DataFrame: cada
+# consulta lê do Parquet só as colunas e as linhas que precisa. Recebe um
+# arquivo ou a lista de partições (uma por ano) a consultar. O índice
+# da barra lateral é montado sobre as combinações distintas de Estado,
+# Município e Região, que é o que ele usa para as opções.
+
+def _identificador(coluna):
+    return '"' + coluna.replace('"', '""') + '"'
+
+
+class ConsultasDuckDB:
+    nome = "duckdb"
+
+    def __init__(self, caminhos_parquet):
+        import duckdb
+
+        if isinstance(caminhos_parquet, str):
+            caminhos_parquet = [caminhos_parquet]
+        arquivos = ", ".join("'" + c.replace("'", "''") + "'" for c in caminhos_parquet)
+        self._conexao = duckdb.connect()
+        # As pastas ano=AAAA não viram coluna: o Ano já está em cada arquivo
+        self._conexao.execute(f"CREATE VIEW dados AS SELECT * FROM read_parquet([{arquivos}], "
+                              "union_by_name = true, hive_partitioning = false)")
+        tipos = dict(self._conexao.execute("SELECT column_name, column_type FROM (DESCRIBE dados)").fetchall())
+        self._flutuantes = {m for m in METRICAS if tipos[m] in ("FLOAT", "DOUBLE")}
+
+        colunas = ", ".join(_identificador(c) for c in ("Estado", "Município", "Região Turística"))
+        self.indice = IndiceFiltros(self._executar(f"SELECT DISTINCT {colunas} FROM dados", []))
+
+    def _executar(self, sql, parametros):
+        # Um cursor por consulta: as sessões do Streamlit rodam em threads
+        # e compartilham a mesma conexão. O resultado passa pelo Arrow, bem
+        # mais rápido que .df() quando há muitas colunas de texto.
+        with self._conexao.cursor() as cursor:
+            resultado = cursor.execute(sql, parametros)
+            # to_arrow_table nas versões novas do DuckDB; fetch_arrow_table nas antigas
+            para_arrow = getattr(resultado, "to_arrow_table", None) or resultado.fetch_arrow_table
+            return para_arrow().to_pandas()
+
+    def _onde(self, selecao):
+        condicoes, parametros = [], []
+        for campo, coluna in COLUNAS_FILTRO.items():
+            valores = selecao.get(campo, "*")
+            if valores == "*":
+                continue
+            negar = isinstance(valores, dict)
+            if negar:
+                valores = valores[EXCLUIR]
+            if not valores:
+                # Lista vazia: nenhuma linha passa (igual à máscara vazia)
+                condicoes.append("FALSE")
+                continue
+            marcadores = ", ".join("?" * len(valores))
+            condicoes.append(f"{_identificador(coluna)} {'NOT IN' if negar else 'IN'} ({marcadores})")
+            parametros.extend(valores)
+        return (" WHERE " + " AND ".join(condicoes) if condicoes else ""), parametros
+
+    def somar(self, consulta):
+        onde, parametros = self._onde(consulta.selecao)
+        por = ", ".join(_identificador(c) for c in consulta.por)
+        somas = ", ".join(
+            f"CAST(SUM({_identificador(m)}) AS {'DOUBLE' if m in self._flutuantes else 'BIGINT'}) AS {_identificador(m)}"
+            for m in METRICAS
+        )
+        # Sem ORDER BY: o CuboAgregado ordena as somas por Estado e Região
+        sql = f"SELECT {por}, {somas}, COUNT(*) AS _linhas FROM dados{onde} GROUP BY {por}"
+        resultado = self._executar(sql, parametros)
+        linhas = int(resultado.pop("_linhas").sum())
+        if "codigo_ibge" in resultado:
+            # Mesmo tipo do DataFrame normalizado (dados.normalizar)
+            resultado["codigo_ibge"] = resultado["codigo_ibge"].astype("string[pyarrow]")
+        return resultado, linhas
+
+    def cubo(self, selecao):
+        return CuboAgregado.de_somas(*self.somar(Consulta(selecao)))
+
+
+# ---------- ESCOLHA DO BACKEND ----------
+
+def criar_consultas(backend, df=None, caminhos_parquet=None):
+    if backend == "duckdb":
+        return ConsultasDuckDB(caminhos_parquet)
+    if backend == "pandas":
+        return ConsultasPandas(df)
+    raise ValueError(f"Backend de consultas desconhecido: {backend} (opções: {', '.join(BACKENDS)})")
+
+
+# ---------- COMPARAÇÃO ----------
+# python consultas.py [planilha.xlsx]
+# Executa as mesmas seleções nos dois backends, confere se as somas batem
+# e mostra o tempo de cada um.
+
+if __name__ == "__main__":
+    import os
+    import sys
+    import time
+
+    from dados import caminho_cache, carregar_planilha
+
+    BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+    planilha = sys.argv[1] if len(sys.argv) > 1 else os.path.join(BASE_DIR, "planilha.xlsx")
+    df, _ = carregar_planilha(planilha)
+    backends = [ConsultasPandas(df), ConsultasDuckDB(caminho_cache(planilha))]
+
+    indice = backends[0].indice
+    maior_estado = max(indice.linhas_estado, key=lambda e: len(indice.linhas_estado[e]))
+    alguns = indice.opcoes_municipio([maior_estado])[:3]
+    selecoes = {
+        "todos": {"estados": "*", "municipios": "*", "regioes": "*"},
+        "um_estado": {"estados": [maior_estado], "municipios": "*", "regioes": "*"},
+        "excluir": {"estados": "*", "municipios": {EXCLUIR: alguns}, "regioes": "*"},
+    }
+    for nome, selecao in selecoes.items():
+        resultados = []
+        for backend in backends:
+            inicio = time.perf_counter()
+            cubo = backend.cubo(selecao)
+            decorrido = (time.perf_counter() - inicio) * 1000
+            resultados.append(cubo)
+            print(f"{nome:<10} {backend.nome:<7} {decorrido:8.1f} ms  {cubo.linhas} linhas  kpis={cubo.kpis()}")
+        pd.testing.assert_frame_equal(
+            resultados[0].estado.astype({"Estado": str}), resultados[1].estado.astype({"Estado": str}),
+            check_dtype=False)
@@ -0,0 +1,310 @@
+# ============================
+# dados.py — Carga da planilha com cache colunar
+# ============================
+
+# ---------- IMPORTS ----------
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+# ---------- CACHE COLUNAR (PARQUET) ----------
+# A planilha é lida pelo openpyxl apenas quando muda. Depois da primeira
+# leitura os dados ficam num arquivo Parquet ao lado do .xlsx
+# (planilha.xlsx -> planilha.parquet), que é muito mais rápido de carregar.
+# O Parquet guarda nos metadados a assinatura da planilha de origem
+# (mtime, tamanho e sha256); se ela mudar, o cache é refeito.
+
+CHAVE_METADADOS = b"painel_origem"
+
+# Muda quando normalizar() muda, para invalidar caches gravados antes
+FORMATO_CACHE = 2
+
+
+def caminho_cache(caminho_planilha):
+    raiz, _ = os.path.splitext(caminho_planilha)
+    return raiz + ".parquet"
+
+
+def _sha256(caminho):
+    h = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def _ler_origem_cache(caminho_parquet):
+    import pyarrow.parquet as pq
+
+    try:
+        metadados = pq.read_schema(caminho_parquet).metadata or {}
+    except (OSError, ValueError):
+        return None
+    bruto = metadados.get(CHAVE_METADADOS)
+    return json.loads(bruto) if bruto else None
+
+
+def _gravar_cache(df, caminho_parquet, origem):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    tabela = pa.Table.from_pandas(df, preserve_index=False)
+    metadados = dict(tabela.schema.metadata or {})
+    metadados[CHAVE_METADADOS] = json.dumps(origem).encode("utf-8")
+    tabela = tabela.replace_schema_metadata(metadados)
+
+    # Grava num arquivo temporário e troca de uma vez, para que outra
+    # sessão nunca leia um Parquet pela metade
+    tmp = f"{caminho_parquet}.{os.getpid()}.tmp"
+    pq.write_table(tabela, tmp)
+    os.replace(tmp, caminho_parquet)
+
+
+def _origem_cache(caminho_parquet):
+    # Assinatura da planilha gravada no Parquet, ou None se não houver
+    # cache válido (ausente, ilegível ou de um formato anterior)
+    origem = _ler_origem_cache(caminho_parquet) if os.path.exists(caminho_parquet) else None
+    if origem and origem.get("formato") != FORMATO_CACHE:
+        return None
+    return origem
+
+
+def _cache_atual(origem, stat):
+    return bool(origem) and origem["mtime_ns"] == stat.st_mtime_ns and origem["tamanho"] == stat.st_size
+
+
+# ---------- NORMALIZAÇÃO ----------
+# Representação compacta em memória: dimensões como categorias, código IBGE
+# como texto (mesma forma do properties.id do mapa.json, convertido uma vez
+# só) e métricas no menor tipo numérico que comporta os valores.
+
+DIMENSOES = ["Macro", "Estado", "Região Turística", "Município", "CLUSTER"]
+
+
+def normalizar(df):
+    df = df.copy()
+    for coluna in DIMENSOES:
+        if coluna in df.columns:
+            df[coluna] = df[coluna].astype("category")
+    if "codigo_ibge" in df.columns:
+        df["codigo_ibge"] = df["codigo_ibge"].astype("Int64").astype("string[pyarrow]")
+    return reduzir_metricas(df)
+
+
+def reduzir_metricas(df):
+    # Métricas no menor tipo numérico que comporta os valores (in-place)
+    for coluna in df.select_dtypes(include="integer").columns:
+        df[coluna] = pd.to_numeric(df[coluna], downcast="integer")
+    for coluna in df.select_dtypes(include="float").columns:
+        df[coluna] = pd.to_numeric(df[coluna], downcast="float")
+    return df
+
+
+def memoria(df):
+    return int(df.memory_usage(deep=True).sum())
+
+
+# ---------- CARGA ----------
+
+def carregar_planilha(caminho_planilha, caminho_parquet=None, ano=None):
+    # Retorna (df, versao). A versão é o sha256 abreviado da planilha e
+    # identifica o conteúdo dos dados para os caches das próximas etapas.
+    # caminho_parquet e ano: usados na base por ano (ver ingerir)
+    stat = os.stat(caminho_planilha)
+    caminho_parquet = caminho_parquet or caminho_cache(caminho_planilha)
+    origem = _origem_cache(caminho_parquet)
+
+    if _cache_atual(origem, stat):
+        return pd.read_parquet(caminho_parquet), origem["sha256"][:12]
+
+    # mtime mudou: só relê a planilha se o conteúdo realmente mudou
+    sha = _sha256(caminho_planilha)
+    nova_origem = {"mtime_ns": stat.st_mtime_ns, "tamanho": stat.st_size,
+                   "sha256": sha, "formato": FORMATO_CACHE}
+    if origem and origem["sha256"] == sha:
+        df = pd.read_parquet(caminho_parquet)
+    else:
+        df = normalizar(pd.read_excel(caminho_planilha))
+        if ano is not None:
+            df["Ano"] = np.int16(ano)
+
+    try:
+        os.makedirs(os.path.dirname(caminho_parquet) or ".", exist_ok=True)
+        _gravar_cache(df, caminho_parquet, nova_origem)
+    except (OSError, ImportError):
+        # Sem permissão de escrita ou sem pyarrow: segue só com a planilha
+        pass
+    return df, sha[:12]
+
+
+def atualizar_cache(caminho_planilha, caminho_parquet=None, ano=None):
+    # Garante que o Parquet corresponde à planilha sem manter os dados na
+    # memória (o backend DuckDB lê direto do arquivo). Retorna
+    # (caminho_parquet, versao), com a mesma versão de carregar_planilha.
+    caminho_parquet = caminho_parquet or caminho_cache(caminho_planilha)
+    origem = _origem_cache(caminho_parquet)
+    if _cache_atual(origem, os.stat(caminho_planilha)):
+        return caminho_parquet, origem["sha256"][:12]
+
+    _, versao = carregar_planilha(caminho_planilha, caminho_parquet, ano)
+    origem = _origem_cache(caminho_parquet)
+    if not origem or origem["sha256"][:12] != versao:
+        raise OSError(f"Não foi possível gravar o cache Parquet em {caminho_parquet}")
+    return caminho_parquet, versao
+
+
+# ---------- BASE PARTICIONADA POR ANO ----------
+# Cada edição do Mapa do Turismo vira uma partição própria:
+#
+#   dados/ano=2018/dados.parquet
+#   dados/ano=2021/dados.parquet
+#
+# com a coluna "Ano" e a assinatura da planilha de origem nos metadados.
+# Só as partições dos anos pedidos são lidas, então a memória e o tempo
+# de carga dependem da seleção, não do tamanho do histórico.
+
+def caminho_particao(pasta, ano):
+    return os.path.join(pasta, f"ano={ano}", "dados.parquet")
+
+
+def ingerir(caminho_planilha, ano, pasta):
+    # Grava (ou atualiza, se a planilha mudou) a partição do ano.
+    # Retorna (caminho da partição, versão)
+    anterior = _origem_cache(caminho_particao(pasta, ano))
+    particao, versao = atualizar_cache(caminho_planilha, caminho_particao(pasta, ano), ano)
+    if anterior and anterior["sha256"][:12] != versao:
+        limpar_mapeados(pasta, ano)
+    return particao, versao
+
+
+def anos_disponiveis(pasta):
+    if not os.path.isdir(pasta):
+        return []
+    anos = []
+    for nome in os.listdir(pasta):
+        if nome.startswith("ano=") and nome[4:].isdigit() \
+                and os.path.exists(caminho_particao(pasta, int(nome[4:]))):
+            anos.append(int(nome[4:]))
+    return sorted(anos)
+
+
+def versao_particao(pasta, ano):
+    return _origem_cache(caminho_particao(pasta, ano))["sha256"][:12]
+
+
+def versao_anos(pasta, anos):
+    return combinar_versoes({ano: versao_particao(pasta, ano) for ano in anos})
+
+
+def combinar_versoes(versoes):
+    # Versão de um conjunto de partições ({ano: versão}); com um ano só é
+    # a própria versão da planilha daquele ano
+    if len(versoes) == 1:
+        return next(iter(versoes.values()))
+    conteudo = "|".join(f"{ano}:{versao}" for ano, versao in sorted(versoes.items()))
+    return hashlib.sha256(conteudo.encode("utf-8")).hexdigest()[:12]
+
+
+def carregar_anos(pasta, anos):
+    # DataFrame só com as partições pedidas
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    # Cada partição foi normalizada sozinha, então a mesma métrica pode
+    # estar em tipos diferentes (int16 num ano, int32 em outro). As tabelas
+    # são lidas uma a uma, juntadas no tipo mais largo de cada coluna e só
+    # depois reduzidas de novo ao menor tipo que comporta todos os anos.
+    # (partitioning=None: o Ano já é coluna dos arquivos; sem isso o
+    # pyarrow acrescenta uma coluna "ano" a partir do nome das pastas)
+    tabelas = [pq.read_table(caminho_particao(pasta, ano), partitioning=None) for ano in anos]
+    df = reduzir_metricas(pa.concat_tables(tabelas, promote_options="permissive").to_pandas())
+    # O pyarrow junta as categorias de cada arquivo na ordem em que aparecem;
+    # ordenadas, as somas por Estado/Região saem na mesma ordem de sempre
+    for coluna in df.select_dtypes(include="category").columns:
+        df[coluna] = df[coluna].cat.set_categories(sorted(df[coluna].cat.categories))
+    return df
+
+
+# ---------- BASE MAPEADA NA MEMÓRIA ----------
+# Para as réplicas do painel num mesmo servidor: os anos carregados são
+# gravados uma vez como arquivo Arrow (dados/arrow/) e cada processo
+# mapeia esse arquivo em vez de manter sua própria cópia dos dados (ver
+# arrow_mapeado.py). O nome leva os anos e a versão das partições, então
+# uma planilha nova gera outro arquivo e o antigo segue válido para quem
+# ainda o usa.
+
+def caminho_mapeado(pasta, anos, versao):
+    return os.path.join(pasta, "arrow", f"anos={'_'.join(map(str, anos))}_{versao}.arrow")
+
+
+def carregar_mapeado(pasta, anos, versao):
+    import pyarrow as pa
+
+    import arrow_mapeado
+
+    caminho = caminho_mapeado(pasta, anos, versao)
+    origem = {"versao": versao, "formato": FORMATO_CACHE}
+    if arrow_mapeado.origem(caminho) != origem:
+        # Primeiro processo a pedir esses anos: monta a tabela a partir
+        # das partições (mesmo resultado de carregar_anos)
+        df = carregar_anos(pasta, anos)
+        try:
+            arrow_mapeado.gravar(pa.Table.from_pandas(df, preserve_index=False).combine_chunks(), caminho, origem)
+        except OSError:
+            # Sem permissão de escrita: segue com a cópia própria do processo
+            return df
+    return arrow_mapeado.para_pandas(arrow_mapeado.mapear(caminho))
+
+
+def limpar_mapeados(pasta, ano):
+    # Remove os arquivos mapeados que incluem o ano (chamado quando a
+    # partição muda). Processos que já mapearam um deles continuam lendo
+    # normalmente; o sistema libera o espaço quando o último o soltar.
+    pasta_arrow = os.path.join(pasta, "arrow")
+    if not os.path.isdir(pasta_arrow):
+        return
+    for nome in os.listdir(pasta_arrow):
+        anos = nome.partition("anos=")[2].rpartition("_")[0].split("_")
+        if str(ano) in anos:
+            try:
+                os.remove(os.path.join(pasta_arrow, nome))
+            except OSError:
+                pass
+
+
+# ---------- MEDIÇÃO ----------
+# python dados.py [planilha.xlsx]
+# Mostra o tempo da carga a frio (openpyxl + gravação do Parquet) e da
+# carga a quente (leitura do Parquet), que é o custo de cada processo novo,
+# e a memória ocupada pelos dados antes e depois da normalização.
+
+if __name__ == "__main__":
+    import sys
+
+    BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+    planilha = sys.argv[1] if len(sys.argv) > 1 else os.path.join(BASE_DIR, "planilha.xlsx")
+
+    inicio = time.perf_counter()
+    bruto = pd.read_excel(planilha)
+    t_excel = time.perf_counter() - inicio
+
+    if os.path.exists(caminho_cache(planilha)):
+        os.remove(caminho_cache(planilha))
+    inicio = time.perf_counter()
+    df, versao = carregar_planilha(planilha)
+    t_frio = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    carregar_planilha(planilha)
+    t_quente = time.perf_counter() - inicio
+
+    print(f"versão dos dados:          {versao} ({len(df)} linhas)")
+    print(f"pd.read_excel (antes):     {t_excel * 1000:8.1f} ms")
+    print(f"carga a frio (xlsx+cache): {t_frio * 1000:8.1f} ms")
+    print(f"carga a quente (parquet):  {t_quente * 1000:8.1f} ms")
+    print(f"memória (planilha bruta):  {memoria(bruto) / 1024:8.1f} KiB")
+    print(f"memória (normalizada):     {memoria(df) / 1024:8.1f} KiB")
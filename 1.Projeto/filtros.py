@@ -0,0 +1,183 @@
+# ============================
+# filtros.py — Índice dos filtros Estado → Município → Região Turística
+# ============================
+
+# ---------- IMPORTS ----------
+import unicodedata
+from functools import cached_property
+
+import numpy as np
+
+
+# ---------- SELEÇÃO DE MUNICÍPIOS ----------
+# "Todos" é implícito: nenhum município é listado. Nos modos "incluir" e
+# "excluir" só os municípios escolhidos pelo usuário são guardados, então
+# o tamanho da seleção (e do que vai ao navegador) não depende de quantos
+# municípios existem nos Estados marcados.
+
+TODOS = "todos"
+INCLUIR = "incluir"
+EXCLUIR = "excluir"
+
+
+class SelecaoMunicipios:
+    def __init__(self, modo=TODOS, municipios=()):
+        if modo not in (TODOS, INCLUIR, EXCLUIR):
+            raise ValueError(f"Modo de seleção desconhecido: {modo}")
+        self.modo = modo
+        self.municipios = frozenset() if modo == TODOS else frozenset(municipios)
+
+    def chave(self):
+        # Forma imutável e ordenada, para as chaves de cache
+        return self.modo, tuple(sorted(self.municipios))
+
+    def resolver(self, opcoes):
+        # Municípios efetivamente selecionados entre as opções disponíveis
+        opcoes = set(opcoes)
+        if self.modo == TODOS:
+            return opcoes
+        if self.modo == INCLUIR:
+            return opcoes & self.municipios
+        return opcoes - self.municipios
+
+
+def _selecao(municipios):
+    # Lista simples de municípios (lote_relatorios, versões anteriores do
+    # painel) equivale ao modo "incluir"
+    if isinstance(municipios, SelecaoMunicipios):
+        return municipios
+    return SelecaoMunicipios(INCLUIR, municipios)
+
+
+def _texto_busca(texto):
+    # Sem acento e sem diferença de maiúsculas: "sao" encontra "São Paulo"
+    texto = unicodedata.normalize("NFKD", str(texto))
+    return "".join(c for c in texto if not unicodedata.combining(c)).casefold()
+
+
+# ---------- ÍNDICE HIERÁRQUICO ----------
+# Montado uma vez na carga dos dados. Guarda quais municípios existem em
+# cada Estado, quais regiões turísticas existem em cada (Estado, Município)
+# e as posições das linhas de cada valor. As opções da barra lateral e o
+# recorte filtrado saem de uniões sobre esse índice, sem varrer o DataFrame
+# a cada interação.
+
+class IndiceFiltros:
+    def __init__(self, df):
+        self.total_linhas = len(df)
+        self.linhas_estado = df.groupby("Estado", sort=True, observed=True).indices
+        self.linhas_municipio = df.groupby("Município", sort=False, observed=True).indices
+        self.linhas_regiao = df.groupby("Região Turística", sort=False, observed=True).indices
+        # Base com mais de um ano (dados.carregar_anos)
+        self.linhas_ano = df.groupby("Ano", sort=True).indices if "Ano" in df.columns else {}
+
+        self.estados = sorted(self.linhas_estado)
+        self.municipios_por_estado = {}
+        self.regioes_por_municipio = {}
+        self.regioes_por_estado = {}
+        pares = df[["Estado", "Município", "Região Turística"]].drop_duplicates()
+        for estado, municipio, regiao in pares.itertuples(index=False):
+            self.municipios_por_estado.setdefault(estado, set()).add(municipio)
+            self.regioes_por_municipio.setdefault((estado, municipio), set()).add(regiao)
+            self.regioes_por_estado.setdefault(estado, set()).add(regiao)
+
+    # ---------- OPÇÕES DA BARRA LATERAL ----------
+
+    def opcoes_municipio(self, estados):
+        municipios = set()
+        for estado in estados:
+            municipios |= self.municipios_por_estado.get(estado, set())
+        return sorted(municipios)
+
+    def opcoes_regiao(self, estados, municipios):
+        selecao = _selecao(municipios)
+        regioes = set()
+        for estado in estados:
+            if selecao.modo == TODOS:
+                regioes |= self.regioes_por_estado.get(estado, set())
+                continue
+            for municipio in selecao.resolver(self.municipios_por_estado.get(estado, set())):
+                regioes |= self.regioes_por_municipio[(estado, municipio)]
+        return sorted(regioes)
+
+    @cached_property
+    def texto_busca(self):
+        # Nomes normalizados para a busca, montados só na primeira busca
+        return {municipio: _texto_busca(municipio) for municipio in self.linhas_municipio}
+
+    def buscar_municipios(self, estados, termo, pagina=0, por_pagina=50):
+        # Busca feita no servidor: retorna (uma página de municípios cujo
+        # nome contém o termo, total de encontrados)
+        termo = _texto_busca(termo.strip()) if termo else ""
+        encontrados = [m for m in self.opcoes_municipio(estados) if termo in self.texto_busca[m]]
+        inicio = pagina * por_pagina
+        return encontrados[inicio:inicio + por_pagina], len(encontrados)
+
+    # ---------- RECORTE FILTRADO ----------
+
+    def _mascara(self, linhas_por_valor, valores):
+        mascara = np.zeros(self.total_linhas, dtype=bool)
+        for valor in valores:
+            posicoes = linhas_por_valor.get(valor)
+            if posicoes is not None:
+                mascara[posicoes] = True
+        return mascara
+
+    def linhas(self, estados, municipios, regioes):
+        # Retorna None quando a seleção cobre todas as linhas
+        return self.linhas_selecao(self.selecao_normalizada(estados, municipios, regioes))
+
+    def linhas_selecao(self, selecao):
+        # Posições das linhas de uma seleção normalizada. Filtros em "*" (ou
+        # ausentes, como "anos") não restringem nada; o custo da máscara de
+        # municípios acompanha o tamanho da lista de incluídos/excluídos,
+        # não o número de municípios.
+        mascara = None
+        for campo, linhas_por_valor in (("estados", self.linhas_estado),
+                                        ("municipios", self.linhas_municipio),
+                                        ("regioes", self.linhas_regiao),
+                                        ("anos", self.linhas_ano)):
+            valores = selecao.get(campo, "*")
+            if valores == "*":
+                continue
+            if isinstance(valores, dict):
+                m = ~self._mascara(linhas_por_valor, valores[EXCLUIR])
+            else:
+                m = self._mascara(linhas_por_valor, valores)
+            mascara = m if mascara is None else mascara & m
+        return None if mascara is None else np.flatnonzero(mascara)
+
+    def selecao_normalizada(self, estados, municipios, regioes):
+        # Forma canônica da seleção, usada como chave de cache: listas
+        # ordenadas e "*" para um filtro que contém todas as opções
+        # disponíveis (e por isso não restringe nada)
+        estados = set(estados)
+        selecao = _selecao(municipios)
+        regioes = set(regioes)
+        opcoes_regiao = self.opcoes_regiao(estados, selecao)
+
+        if selecao.modo == TODOS:
+            chave_municipios = "*"
+        else:
+            opcoes_municipio = set(self.opcoes_municipio(estados))
+            if selecao.modo == INCLUIR:
+                chave_municipios = "*" if selecao.municipios.issuperset(opcoes_municipio) \
+                    else sorted(selecao.municipios & opcoes_municipio)
+            else:
+                excluidos = selecao.municipios & opcoes_municipio
+                chave_municipios = {EXCLUIR: sorted(excluidos)} if excluidos else "*"
+        return {
+            "estados": "*" if estados.issuperset(self.estados) else sorted(estados),
+            "municipios": chave_municipios,
+            "regioes": "*" if regioes.issuperset(opcoes_regiao)
+            else sorted(regioes & set(opcoes_regiao)),
+        }
+
+    def filtrar(self, df, estados, municipios, regioes):
+        return self.filtrar_selecao(df, self.selecao_normalizada(estados, municipios, regioes))
+
+    def filtrar_selecao(self, df, selecao):
+        # Sem restrição devolve o próprio DataFrame (sem cópia); caso
+        # contrário copia apenas as linhas selecionadas
+        posicoes = self.linhas_selecao(selecao)
+        return df if posicoes is None else df.take(posicoes)
@@ -0,0 +1,77 @@
+# ============================
+# formatacao.py — Números e moeda no padrão brasileiro
+# ============================
+
+# ---------- IMPORTS ----------
+import numpy as np
+import pandas as pd
+
+# Separador de milhar inserido de uma vez em toda a coluna de texto
+_MILHAR = r"\B(?=(\d{3})+(?!\d))"
+
+
+# ---------- SÉRIES (VETORIZADO) ----------
+# Formata a coluna inteira com operações de texto do pandas, sem chamar
+# uma função Python por linha. Valores ausentes viram zero.
+
+def _inteiros_com_milhar(valores):
+    # valores: array de inteiros não negativos
+    return pd.Series(valores.astype(str), dtype=object).str.replace(_MILHAR, ".", regex=True)
+
+
+def formatar_inteiros(serie):
+    numeros = pd.to_numeric(serie, errors="coerce").astype("float64").fillna(0).to_numpy()
+    inteiros = np.rint(numeros).astype("int64")
+    texto = _inteiros_com_milhar(np.abs(inteiros))
+    texto = texto.where(inteiros >= 0, "-" + texto)
+    texto.index = serie.index
+    return texto
+
+
+def formatar_moedas(serie, casas=2):
+    numeros = pd.to_numeric(serie, errors="coerce").astype("float64").fillna(0).to_numpy()
+    escala = 10 ** casas
+    centavos = np.rint(np.abs(numeros) * escala).astype("int64")
+    sinal = pd.Series(np.where((numeros < 0) & (centavos > 0), "-", ""), dtype=object)
+    texto = "R$ " + sinal + _inteiros_com_milhar(centavos // escala)
+    if casas:
+        fracao = pd.Series((centavos % escala).astype(str), dtype=object).str.zfill(casas)
+        texto = texto + "," + fracao
+    texto.index = serie.index
+    return texto
+
+
+def formatar_percentuais(serie, casas=1):
+    # Frações (0.234) como "23,4%"
+    numeros = pd.to_numeric(serie, errors="coerce").astype("float64").fillna(0).to_numpy() * 100
+    escala = 10 ** casas
+    decimos = np.rint(np.abs(numeros) * escala).astype("int64")
+    sinal = pd.Series(np.where((numeros < 0) & (decimos > 0), "-", ""), dtype=object)
+    texto = sinal + _inteiros_com_milhar(decimos // escala)
+    if casas:
+        fracao = pd.Series((decimos % escala).astype(str), dtype=object).str.zfill(casas)
+        texto = texto + "," + fracao
+    texto = texto + "%"
+    texto.index = serie.index
+    return texto
+
+
+# ---------- VALORES ÚNICOS (KPIs, TABELA DO PDF) ----------
+# Mesmo resultado das versões vetorizadas, para um valor só
+
+_TROCA_SEPARADORES = str.maketrans({",": ".", ".": ","})
+
+
+def formatar_inteiro(valor):
+    if pd.isna(valor):
+        valor = 0
+    return f"{round(valor):,}".replace(",", ".")
+
+
+def formatar_moeda(valor, casas=2):
+    if pd.isna(valor):
+        valor = 0
+    texto = f"{valor:,.{casas}f}".translate(_TROCA_SEPARADORES)
+    if texto.startswith("-") and not texto.strip("-0,."):
+        texto = texto[1:]
+    return f"R$ {texto}"
@@ -0,0 +1,123 @@
+# ============================
+# geometria.py — Malha municipal (GeoJSON) indexada por código IBGE
+# ============================
+
+# ---------- IMPORTS ----------
+import json
+import os
+
+
+# ---------- ÍNDICE DE GEOMETRIAS ----------
+# O mapa.json é lido uma única vez e as features ficam indexadas por
+# properties.id (código IBGE como texto). Cada mapa recebe apenas as
+# features dos municípios que estão no filtro, e não a malha do país inteiro.
+
+class MalhaMunicipal:
+    def __init__(self, geojson):
+        self.features = {}
+        for feature in geojson.get("features", []):
+            codigo = str(feature.get("properties", {}).get("id"))
+            self.features[codigo] = feature
+
+    @classmethod
+    def de_arquivo(cls, caminho):
+        with open(caminho, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def __len__(self):
+        return len(self.features)
+
+    def subconjunto(self, codigos):
+        # Códigos sem geometria são ignorados (o Plotly também os ignoraria)
+        selecionadas = []
+        for codigo in dict.fromkeys(map(str, codigos)):
+            feature = self.features.get(codigo)
+            if feature is not None:
+                selecionadas.append(feature)
+        return {"type": "FeatureCollection", "features": selecionadas}
+
+
+# ---------- MALHA MAPEADA NA MEMÓRIA ----------
+# O dicionário do mapa.json ocupa dezenas de MB em cada processo. Aqui o
+# arquivo é convertido uma vez para Arrow (mapa.json -> mapa.arrow, com o
+# código IBGE e o texto JSON de cada feature) e cada processo só mapeia o
+# arquivo (ver arrow_mapeado.py). Na memória do processo fica o índice
+# código -> linha; as features de um mapa são decodificadas quando ele é
+# montado. Mesma interface da MalhaMunicipal.
+
+def caminho_arrow(caminho_mapa):
+    raiz, _ = os.path.splitext(caminho_mapa)
+    return raiz + ".arrow"
+
+
+class MalhaMapeada:
+    def __init__(self, tabela):
+        self._features = tabela.column("feature")
+        self._linhas = {codigo: i for i, codigo in enumerate(tabela.column("id").to_pylist())}
+
+    @classmethod
+    def de_arquivo(cls, caminho):
+        # Refaz o .arrow quando o .json muda (mtime ou tamanho)
+        import pyarrow as pa
+
+        import arrow_mapeado
+
+        stat = os.stat(caminho)
+        origem = {"mtime_ns": stat.st_mtime_ns, "tamanho": stat.st_size}
+        caminho_malha = caminho_arrow(caminho)
+        if arrow_mapeado.origem(caminho_malha) != origem:
+            features = MalhaMunicipal.de_arquivo(caminho).features
+            tabela = pa.table({
+                "id": pa.array(list(features), pa.string()),
+                "feature": pa.array([json.dumps(f, separators=(",", ":")) for f in features.values()], pa.string()),
+            })
+            try:
+                arrow_mapeado.gravar(tabela, caminho_malha, origem)
+            except OSError:
+                # Sem permissão de escrita: usa a tabela em memória mesmo
+                return cls(tabela)
+        return cls(arrow_mapeado.mapear(caminho_malha))
+
+    def __len__(self):
+        return len(self._linhas)
+
+    def subconjunto(self, codigos):
+        import pyarrow as pa
+
+        linhas = [self._linhas[c] for c in dict.fromkeys(map(str, codigos)) if c in self._linhas]
+        # Tipo explícito: uma lista vazia viraria um array de tipo nulo
+        textos = self._features.take(pa.array(linhas, pa.int64())).to_pylist()
+        return {"type": "FeatureCollection", "features": json.loads("[" + ",".join(textos) + "]")}
+
+
+# ---------- NÍVEIS DE DETALHE ----------
+# O script simplificar_mapa.py gera cópias simplificadas do mapa.json
+# (mapa_media.json, mapa_baixa.json). A tolerância está em graus.
+NIVEIS = {"alta": 0.0, "media": 0.01, "baixa": 0.05}
+
+# Com poucos municípios no filtro o usuário tende a aproximar o mapa,
+# então a malha original é mantida
+LIMITE_DETALHE = 100
+
+
+def caminho_nivel(caminho_mapa, nivel):
+    if nivel == "alta":
+        return caminho_mapa
+    raiz, ext = os.path.splitext(caminho_mapa)
+    return f"{raiz}_{nivel}{ext}"
+
+
+def graus_por_pixel(zoom):
+    # Largura de um pixel na projeção Web Mercator. O choropleth_mapbox
+    # desenha com o Mapbox GL, cujos tiles têm 512 px (não os 256 px dos
+    # tiles raster)
+    return 360.0 / (512 * 2 ** zoom)
+
+
+def escolher_nivel(zoom, qtd_features):
+    if qtd_features <= LIMITE_DETALHE:
+        return "alta"
+    # Nível mais simplificado cujo erro fica abaixo de meio pixel
+    meio_pixel = graus_por_pixel(zoom) / 2
+    candidatos = [n for n, tol in NIVEIS.items() if tol <= meio_pixel]
+    return max(candidatos, key=NIVEIS.get)
@@ -0,0 +1,166 @@
+# ============================
+# graficos.py — Figuras Plotly do painel
+# ============================
+#
+# Cada função recebe o CuboAgregado da seleção (mais a malha, no caso dos
+# mapas) ou a série por ano e devolve a figura pronta; o app só posiciona
+# e exibe. Nada aqui depende do Streamlit, então as mesmas funções servem
+# para medição.
+
+# ---------- IMPORTS ----------
+import pandas as pd
+import plotly.express as px
+
+from formatacao import formatar_inteiros, formatar_moedas
+
+ZOOM_MAPA = 3.3
+
+
+# ---------- TURISMO ----------
+
+def _barras_por_estado(cubo, metrica):
+    por_uf = cubo.estado[["Estado", metrica]].copy()
+    por_uf["hover"] = formatar_inteiros(por_uf[metrica])
+    fig = px.bar(por_uf, x="Estado", y=metrica, height=420
+                 )
+    fig.update_traces(marker=dict(color="#1C4D86"),
+                      customdata=por_uf[["hover"]],
+                      hovertemplate="<b>%{x}</b><br>%{customdata[0]}<extra></extra>"
+                      )
+    fig.update_layout(
+        plot_bgcolor="rgba(0,0,0,0)",  # fundo da área do gráfico
+        paper_bgcolor="rgba(0,0,0,0)",  # fundo externo
+        yaxis=dict(title=None, tickfont=dict(color="#1A1A1A")),
+        xaxis=dict(title=None, tickfont=dict(color="#1A1A1A"))
+    )
+    return fig
+
+
+# Gráfico --> Quantidade de empregos por Estado
+def figura_empregos(cubo):
+    return _barras_por_estado(cubo, "Empregos")
+
+
+# Gráfico --> Quantidade de estabelecimentos turísticos por Estado
+def figura_estabelecimentos(cubo):
+    return _barras_por_estado(cubo, "Estabelecimentos")
+
+
+# Gráfico --> Comparação entre visitas nacionais e internacionais
+def figura_visitas(cubo):
+    visitas = (cubo.estado[["Estado", "Visitas Nacionais", "Visitas Internacionais"]]
+               .sort_values(by="Visitas Nacionais", ascending=False)
+               )
+    ordem_estados = visitas["Estado"].tolist()
+
+    df_long = visitas.melt(id_vars="Estado", var_name="Tipo", value_name="Quantidade"
+                           )
+    df_long["Tipo"] = df_long["Tipo"].str.strip()
+
+    df_long["Tipo"] = pd.Categorical(df_long["Tipo"], categories=["Visitas Internacionais", "Visitas Nacionais"],
+                                     ordered=True
+                                     )
+    df_long["hover"] = formatar_inteiros(df_long["Quantidade"])
+    fig = px.bar(df_long, x="Quantidade", y="Estado", orientation='h',
+                 color="Tipo", barmode="group", height=540,
+                 category_orders={"Tipo": ["Visitas Internacionais", "Visitas Nacionais"],
+                                  "Estado": ordem_estados},
+                 color_discrete_map={
+                     "Visitas Internacionais": "#F5A623", "Visitas Nacionais": "#1C4D86"}
+                 )
+    fig.update_traces(
+        selector=dict(name="Visitas Nacionais"),
+        customdata=df_long[df_long["Tipo"] ==
+                           "Visitas Nacionais"][["hover"]],
+        hovertemplate="<b>%{y}</b><br>%{customdata[0]}<extra></extra>"
+    )
+    fig.update_traces(
+        selector=dict(name="Visitas Internacionais"),
+        customdata=df_long[df_long["Tipo"] ==
+                           "Visitas Internacionais"][["hover"]],
+        hovertemplate="<b>%{y}</b><br>%{customdata[0]}<extra></extra>"
+    )
+    fig.update_layout(
+        plot_bgcolor="rgba(0,0,0,0)", paper_bgcolor="rgba(0,0,0,0)", legend=dict(traceorder="reversed"),
+        yaxis=dict(title=None, tickfont=dict(color="#1A1A1A")),
+        xaxis=dict(title=None, tickfont=dict(
+            color="#1A1A1A"), showgrid=True)
+    )
+    return fig
+
+
+# ---------- ARRECADAÇÃO ----------
+
+# Gráfico --> Evolução da arrecadação turística
+# serie: somas da seleção por ano (uma linha por ano, coluna "Ano")
+def figura_evolucao_arrecadacao(serie):
+    arrecadacaoAno = serie[["Ano", "Arrecadação"]].sort_values("Ano")
+    arrecadacaoAno["Arrecadacao_hover"] = formatar_moedas(arrecadacaoAno["Arrecadação"])
+    fig = px.line(arrecadacaoAno, x="Ano", y="Arrecadação", height=520, markers=True,
+                  color_discrete_sequence=["#F5A623"]
+                  )
+    fig.update_traces(
+        customdata=arrecadacaoAno[["Arrecadacao_hover"]],
+        hovertemplate="<b>%{x}</b><br>%{customdata[0]}<extra></extra>"
+    )
+    fig.update_layout(
+        plot_bgcolor="rgba(0,0,0,0)", paper_bgcolor="rgba(0,0,0,0)",
+        yaxis=dict(title=None, tickfont=dict(color="#1A1A1A")),
+        # Um tique por ano, sem frações
+        xaxis=dict(title=None, tickfont=dict(color="#1A1A1A"), tickmode="array",
+                   tickvals=arrecadacaoAno["Ano"].tolist()),
+    )
+    return fig
+
+
+# ---------- MAPAS ----------
+# malha: MalhaMunicipal do nível de detalhe escolhido pelo app; o mapa
+# recebe só as geometrias dos municípios da seleção.
+
+def _mapa_municipios(cubo, malha, metrica, formatar):
+    df_mapa = cubo.municipio[["codigo_ibge", "Município", metrica]].copy()
+    geojson_mapa = malha.subconjunto(df_mapa["codigo_ibge"])
+    df_mapa["hover"] = formatar(df_mapa[metrica])
+    fig = px.choropleth_mapbox(
+        df_mapa,
+        geojson=geojson_mapa,
+        locations="codigo_ibge",
+        featureidkey="properties.id",
+        hover_name="Município",
+        custom_data=["hover"],
+        mapbox_style="carto-positron",
+        center={"lat": -10, "lon": -52},
+        zoom=ZOOM_MAPA,
+        opacity=0.7,
+        height=520
+    )
+    fig.update_traces(hovertemplate="<b>%{hovertext}</b><br>" +
+                      "<br>%{customdata[0]}<extra></extra>")
+    fig.update_layout(
+        plot_bgcolor="rgba(0,0,0,0)", paper_bgcolor="rgba(0,0,0,0)",
+        margin={"r": 0, "t": 40, "l": 0, "b": 0}
+    )
+    return fig
+
+
+# Gráfico --> Visitas por Município
+def figura_mapa_visitas(cubo, malha):
+    return _mapa_municipios(cubo, malha, "Visitas", formatar_inteiros)
+
+
+# Gráfico --> Arrecadação por Município
+def figura_mapa_arrecadacao(cubo, malha):
+    return _mapa_municipios(cubo, malha, "Arrecadação", formatar_moedas)
+
+
+# ---------- AQUECIMENTO ----------
+# Num processo novo, a primeira figura de cada tipo é bem mais lenta que
+# as seguintes: o Plotly carrega validadores e o template sob demanda.
+# Figuras mínimas de cada tipo usado no painel pagam esse custo antes.
+
+def aquecer():
+    df = pd.DataFrame({"x": ["a"], "y": [0], "id": ["0"]})
+    px.bar(df, x="x", y="y").to_json()
+    px.line(df, x="x", y="y", markers=True).to_json()
+    px.choropleth_mapbox(df, geojson={"type": "FeatureCollection", "features": []}, locations="id",
+                         featureidkey="properties.id", mapbox_style="carto-positron").to_json()
@@ -0,0 +1,123 @@
+# ============================
+# graficos_vetoriais.py — Gráficos do relatório como desenho vetorial
+# ============================
+#
+# Os mesmos quatro gráficos de relatorio.desenhar_grafico, desenhados com
+# reportlab.graphics direto no PDF (sem matplotlib e sem PNG de 300 dpi).
+# A arrecadação é a linha por ano quando há evolução (serie_anos) e as
+# barras por Estado quando não há (serie_anos=None).
+# O Drawing retornado entra na story como qualquer outro Flowable.
+
+# ---------- IMPORTS ----------
+from reportlab.graphics.charts.barcharts import HorizontalBarChart, VerticalBarChart
+from reportlab.graphics.charts.legends import Legend
+from reportlab.graphics.charts.linecharts import HorizontalLineChart
+from reportlab.graphics.shapes import Drawing
+from reportlab.graphics.widgets.markers import makeMarker
+from reportlab.lib import colors
+from reportlab.lib.units import inch
+
+from formatacao import formatar_inteiro
+
+AZUL = colors.HexColor("#1C4D86")
+LARANJA = colors.HexColor("#F5A623")
+
+LARGURA = 5 * inch
+ALTURA = 3.5 * inch
+
+
+def _eixo_valores(eixo):
+    eixo.valueMin = 0
+    eixo.labels.fontSize = 6
+    eixo.labelTextFormat = formatar_inteiro
+    eixo.visibleGrid = True
+    eixo.gridStrokeColor = colors.HexColor("#DDDDDD")
+    eixo.gridStrokeWidth = 0.3
+
+
+def _eixo_estados_x(eixo, estados):
+    eixo.categoryNames = estados
+    eixo.labels.fontSize = 6
+    eixo.labels.angle = 45
+    eixo.labels.boxAnchor = "ne"
+    eixo.labels.dx = 2
+    eixo.labels.dy = -2
+
+
+def _barras(estados, valores, cor=AZUL):
+    desenho = Drawing(LARGURA, ALTURA)
+    grafico = VerticalBarChart()
+    grafico.x, grafico.y = 45, 30
+    grafico.width, grafico.height = LARGURA - 55, ALTURA - 40
+    grafico.data = [valores]
+    grafico.bars[0].fillColor = cor
+    grafico.bars.strokeColor = None
+    _eixo_estados_x(grafico.categoryAxis, estados)
+    _eixo_valores(grafico.valueAxis)
+    desenho.add(grafico)
+    return desenho
+
+
+def _visitas(df_uf):
+    # Ordenar do maior para o menor (baseado em visitas nacionais). O
+    # reportlab desenha a primeira categoria embaixo, então a ordem é
+    # invertida para o maior estado ficar no topo, como no painel.
+    visitas = df_uf.sort_values(by="Visitas Nacionais", ascending=True)
+    estados = visitas["Estado"].astype(str).tolist()
+
+    desenho = Drawing(LARGURA, ALTURA)
+    grafico = HorizontalBarChart()
+    grafico.x, grafico.y = 30, 40
+    grafico.width, grafico.height = LARGURA - 40, ALTURA - 50
+    # Série 0 fica abaixo da série 1 em cada categoria: Internacional embaixo
+    grafico.data = [visitas["Visitas Internacionais"].tolist(), visitas["Visitas Nacionais"].tolist()]
+    grafico.bars[0].fillColor = LARANJA
+    grafico.bars[1].fillColor = AZUL
+    grafico.bars.strokeColor = None
+    grafico.categoryAxis.categoryNames = estados
+    grafico.categoryAxis.labels.fontSize = 6
+    _eixo_valores(grafico.valueAxis)
+    grafico.valueAxis.labels.angle = 45
+    grafico.valueAxis.labels.boxAnchor = "ne"
+    desenho.add(grafico)
+
+    legenda = Legend()
+    legenda.x, legenda.y = LARGURA - 130, ALTURA - 5
+    legenda.fontSize = 7
+    legenda.columnMaximum = 2
+    legenda.colorNamePairs = [(AZUL, "Visitas Nacionais"), (LARANJA, "Visitas Internacionais")]
+    desenho.add(legenda)
+    return desenho
+
+
+def _linha(anos, valores):
+    desenho = Drawing(LARGURA, ALTURA)
+    grafico = HorizontalLineChart()
+    grafico.x, grafico.y = 60, 30
+    grafico.width, grafico.height = LARGURA - 70, ALTURA - 40
+    grafico.data = [valores]
+    grafico.lines[0].strokeColor = LARANJA
+    grafico.lines[0].strokeWidth = 1.5
+    grafico.lines[0].symbol = makeMarker("FilledCircle", size=3, fillColor=LARANJA)
+    grafico.joinedLines = 1
+    grafico.categoryAxis.categoryNames = anos
+    grafico.categoryAxis.labels.fontSize = 7
+    _eixo_valores(grafico.valueAxis)
+    desenho.add(grafico)
+    return desenho
+
+
+def desenhar_grafico_vetorial(chave, df_uf, serie_anos=None):
+    estados = df_uf["Estado"].astype(str).tolist()
+    if chave == "empregos":
+        return _barras(estados, df_uf["Empregos"].tolist())
+    if chave == "estabelecimentos":
+        return _barras(estados, df_uf["Estabelecimentos"].tolist())
+    if chave == "visitas":
+        return _visitas(df_uf)
+    if chave == "arrecadacao" and serie_anos is not None:
+        serie = serie_anos.sort_values("Ano")
+        return _linha(serie["Ano"].astype(str).tolist(), serie["Arrecadação"].tolist())
+    if chave == "arrecadacao":
+        return _barras(estados, df_uf["Arrecadação"].tolist(), cor=LARANJA)
+    raise ValueError(f"Gráfico desconhecido: {chave}")
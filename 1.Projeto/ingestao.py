@@ -0,0 +1,64 @@
+# ============================
+# ingestao.py — Carga das edições do Mapa do Turismo na base por ano
+# ============================
+#
+# Cada planilha (uma por edição, no mesmo formato da planilha.xlsx) é
+# normalizada e gravada como a partição do seu ano em dados/ (ver
+# dados.ingerir). Uma partição só é refeita quando a planilha muda. O
+# painel em execução percebe a partição nova sozinho (atualizacao.py) e
+# passa a oferecer o ano na barra lateral.
+#
+#   python ingestao.py 2018=planilha.xlsx
+#   python ingestao.py 2018=mapa_2019_2021.xlsx 2021=mapa_2022_2024.xlsx
+#   python ingestao.py --listar
+
+# ---------- IMPORTS ----------
+import argparse
+import os
+import sys
+import time
+
+from dados import anos_disponiveis, ingerir
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PASTA_DADOS = os.path.join(BASE_DIR, "dados")
+
+# A planilha.xlsx é a edição 2019-2021 (ano-base 2018); o painel e o lote
+# de relatórios a gravam na base sozinhos
+PLANILHA = os.path.join(BASE_DIR, "planilha.xlsx")
+ANO_PLANILHA = 2018
+
+
+def _edicao(texto):
+    # "2018=planilha.xlsx" -> (2018, "planilha.xlsx")
+    ano, separador, caminho = texto.partition("=")
+    if not separador or not ano.isdigit() or not caminho:
+        raise argparse.ArgumentTypeError(f"use ANO=planilha.xlsx (recebido: {texto})")
+    return int(ano), caminho
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Grava cada edição da planilha como a partição do seu ano.")
+    parser.add_argument("edicoes", nargs="*", type=_edicao, metavar="ANO=PLANILHA")
+    parser.add_argument("--pasta", default=PASTA_DADOS, help="pasta da base por ano")
+    parser.add_argument("--listar", action="store_true", help="mostra os anos já gravados")
+    args = parser.parse_args(argv)
+
+    if not args.edicoes and not args.listar:
+        parser.error("informe ao menos uma edição (ANO=planilha.xlsx) ou --listar")
+
+    for ano, caminho in args.edicoes:
+        inicio = time.perf_counter()
+        try:
+            particao, versao = ingerir(caminho, ano, args.pasta)
+        except (OSError, ValueError) as erro:
+            print(f"ERRO  {ano} ({caminho}): {erro}", file=sys.stderr)
+            return 1
+        print(f"{ano}: {particao} (versão {versao}) — {time.perf_counter() - inicio:.1f} s")
+
+    print(f"Anos na base: {', '.join(map(str, anos_disponiveis(args.pasta))) or 'nenhum'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
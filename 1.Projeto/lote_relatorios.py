@@ -0,0 +1,159 @@
+# ============================
+# lote_relatorios.py — Geração dos relatórios PDF em lote (sem Streamlit)
+# ============================
+#
+# Gera, fora do painel, os mesmos PDFs do botão "Gerar Relatório em PDF":
+# um por Estado e/ou um por Região Turística. Usa os mesmos dados do app
+# (a partição do ano em dados/, com a planilha.xlsx já gravada nela) e o
+# mesmo caminho (IndiceFiltros.filtrar → CuboAgregado → gerar_pdf), e
+# distribui os relatórios entre os núcleos da máquina. Sem --ano, usa o
+# ano mais recente da base, que é o que o painel abre.
+#
+#   python lote_relatorios.py                         # todos os Estados e Regiões
+#   python lote_relatorios.py --ano 2018
+#   python lote_relatorios.py --por estado            # só os 27 Estados
+#   python lote_relatorios.py --por regiao --estado SP --estado RJ
+#   python lote_relatorios.py --saida /tmp/pdfs --processos 4
+
+# ---------- IMPORTS ----------
+import argparse
+import os
+import re
+import sys
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from agregacao import CuboAgregado
+from dados import anos_disponiveis, carregar_anos, ingerir, versao_particao
+from filtros import IndiceFiltros, SelecaoMunicipios
+from ingestao import ANO_PLANILHA, PASTA_DADOS, PLANILHA
+from relatorio import gerar_pdf
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+# ---------- ESPECIFICAÇÕES ----------
+# Cada relatório é descrito por (nome do arquivo, estados, municípios,
+# regiões), na mesma forma que os filtros da barra lateral.
+
+def _slug(texto):
+    texto = unicodedata.normalize("NFKD", str(texto)).encode("ascii", "ignore").decode()
+    return re.sub(r"[^A-Za-z0-9]+", "_", texto).strip("_").lower() or "sem_nome"
+
+
+def montar_especificacoes(indice, por=("estado", "regiao"), estados=None):
+    especificacoes = []
+    todos = SelecaoMunicipios()
+    for estado in estados or indice.estados:
+        regioes = indice.opcoes_regiao([estado], todos)
+        if "estado" in por:
+            especificacoes.append((f"estado_{estado}.pdf", [estado], todos, regioes))
+        if "regiao" in por:
+            for regiao in regioes:
+                especificacoes.append((
+                    f"regiao_{estado}_{_slug(regiao)}.pdf",
+                    [estado], todos, [regiao],
+                ))
+    return especificacoes
+
+
+# ---------- EXECUÇÃO NOS PROCESSOS ----------
+# Cada processo carrega os dados uma vez (leitura da partição do ano) e
+# monta o próprio índice; as tarefas levam só a especificação.
+
+_df = None
+_indice = None
+_versao = None
+
+
+def _iniciar(pasta, ano):
+    global _df, _indice, _versao
+    _df = carregar_anos(pasta, [ano])
+    _versao = versao_particao(pasta, ano)
+    _indice = IndiceFiltros(_df)
+
+
+def _gerar(pasta_saida, especificacao):
+    nome, estados, municipios, regioes = especificacao
+    inicio = time.perf_counter()
+    cubo = CuboAgregado(_indice.filtrar(_df, estados, municipios, regioes))
+    # paralelo=False: o lote já ocupa um processo por núcleo
+    pdf, _ = gerar_pdf(cubo.estado, cubo.kpis(), paralelo=False, versao_dados=_versao)
+
+    destino = os.path.join(pasta_saida, nome)
+    temporario = destino + ".tmp"
+    with open(temporario, "wb") as arquivo:
+        arquivo.write(pdf)
+    os.replace(temporario, destino)
+    return nome, len(pdf), time.perf_counter() - inicio
+
+
+def gerar_lote(pasta, ano, pasta_saida, especificacoes, processos=None):
+    # Retorna (gerados, falhas): gerados é uma lista de (nome, bytes,
+    # segundos) e falhas uma lista de (nome, erro)
+    os.makedirs(pasta_saida, exist_ok=True)
+    processos = processos or os.cpu_count() or 1
+    gerados, falhas = [], []
+
+    with ProcessPoolExecutor(max_workers=processos, initializer=_iniciar,
+                             initargs=(pasta, ano)) as executor:
+        futuros = {executor.submit(_gerar, pasta_saida, e): e[0] for e in especificacoes}
+        for futuro in as_completed(futuros):
+            nome = futuros[futuro]
+            try:
+                gerados.append(futuro.result())
+            except Exception as erro:
+                falhas.append((nome, erro))
+                print(f"ERRO  {nome}: {erro}", file=sys.stderr)
+    return gerados, falhas
+
+
+# ---------- LINHA DE COMANDO ----------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera os relatórios PDF por Estado e por Região Turística.")
+    parser.add_argument("--planilha", default=PLANILHA,
+                        help=f"gravada na base como o ano {ANO_PLANILHA}, como o painel faz ao iniciar")
+    parser.add_argument("--pasta", default=PASTA_DADOS, help="pasta da base por ano")
+    parser.add_argument("--ano", type=int, default=None,
+                        help="ano dos relatórios (padrão: o mais recente da base)")
+    parser.add_argument("--saida", default=os.path.join(BASE_DIR, "relatorios"),
+                        help="pasta onde os PDFs são gravados")
+    parser.add_argument("--por", action="append", choices=["estado", "regiao"],
+                        help="tipo de relatório (pode repetir; padrão: os dois)")
+    parser.add_argument("--estado", action="append", metavar="UF",
+                        help="limita o lote a estes Estados (pode repetir)")
+    parser.add_argument("--processos", type=int, default=None,
+                        help="processos em paralelo (padrão: número de núcleos)")
+    args = parser.parse_args(argv)
+
+    ingerir(args.planilha, ANO_PLANILHA, args.pasta)
+    anos = anos_disponiveis(args.pasta)
+    ano = args.ano if args.ano is not None else anos[-1]
+    if ano not in anos:
+        parser.error(f"Ano sem dados: {ano} (anos na base: {', '.join(map(str, anos))})")
+
+    df = carregar_anos(args.pasta, [ano])
+    indice = IndiceFiltros(df)
+    desconhecidos = sorted(set(args.estado or []) - set(indice.estados))
+    if desconhecidos:
+        parser.error(f"Estado(s) sem dados: {', '.join(desconhecidos)}")
+
+    especificacoes = montar_especificacoes(indice, por=args.por or ("estado", "regiao"), estados=args.estado)
+    del df, indice
+
+    inicio = time.perf_counter()
+    gerados, falhas = gerar_lote(args.pasta, ano, args.saida, especificacoes, args.processos)
+    total = time.perf_counter() - inicio
+
+    print(f"{len(gerados)} PDF(s) de {ano} em {args.saida} — {total:.1f} s"
+          f" ({sum(b for _, b, _ in gerados) / 1024 / 1024:.1f} MiB)")
+    if falhas:
+        print(f"{len(falhas)} falha(s)", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+# ============================
+# medicao.py — Tempo de cada etapa do painel e do relatório
+# ============================
+#
+# Cada execução do script (ou cada relatório) usa um Cronometro; os
+# trechos medidos ficam dentro de `with cronometro.etapa("nome"):`. No fim,
+# registrar() acrescenta uma linha JSON ao log, que pode ser resumida
+# depois com `python medicao.py` (p50/p95/p99 por etapa).
+
+# ---------- IMPORTS ----------
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Variável de ambiente vazia desliga o log
+CAMINHO_LOG = os.environ.get("PAINEL_LOG_TEMPOS", os.path.join(BASE_DIR, "logs", "tempos.jsonl"))
+
+# Acima disso o log atual vira tempos.jsonl.1 e um novo é iniciado
+TAMANHO_MAXIMO_LOG = 50 * 1024 * 1024
+
+
+# ---------- CRONÔMETRO ----------
+
+class Cronometro:
+    def __init__(self):
+        self.etapas = {}
+        self.registrado = False
+        self._inicio = time.perf_counter()
+
+    @contextmanager
+    def etapa(self, nome):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            # Uma etapa repetida na mesma execução acumula o tempo
+            decorrido = (time.perf_counter() - inicio) * 1000
+            self.etapas[nome] = self.etapas.get(nome, 0.0) + decorrido
+
+    def total_ms(self):
+        return (time.perf_counter() - self._inicio) * 1000
+
+
+# ---------- LOG (JSON LINES) ----------
+# Uma linha por registro, gravada de uma vez em modo append: as sessões
+# (threads) e os processos da fila de relatórios escrevem no mesmo arquivo.
+
+_lock = threading.Lock()
+
+
+def _refazer_lock():
+    global _lock
+    _lock = threading.Lock()
+
+
+# Os processos da fila de relatórios nascem de um fork do servidor
+# (tarefas.contexto_processos): se outra thread estivesse gravando no log
+# no instante da cópia, o filho herdaria o lock fechado e travaria no
+# primeiro registrar. O filho sempre começa com um lock novo.
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_refazer_lock)
+
+
+def _girar_log():
+    try:
+        if os.path.getsize(CAMINHO_LOG) > TAMANHO_MAXIMO_LOG:
+            os.replace(CAMINHO_LOG, CAMINHO_LOG + ".1")
+    except FileNotFoundError:
+        pass
+
+
+def registrar(tipo, cronometro, **contexto):
+    cronometro.registrado = True
+    if not CAMINHO_LOG:
+        return
+    registro = {
+        "ts": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+        "tipo": tipo,
+        "pid": os.getpid(),
+        **contexto,
+        "total_ms": round(cronometro.total_ms(), 3),
+        "etapas": {nome: round(ms, 3) for nome, ms in cronometro.etapas.items()},
+    }
+    linha = json.dumps(registro, ensure_ascii=False, default=str) + "\n"
+    try:
+        os.makedirs(os.path.dirname(CAMINHO_LOG) or ".", exist_ok=True)
+        with _lock:
+            _girar_log()
+            with open(CAMINHO_LOG, "a", encoding="utf-8") as arquivo:
+                arquivo.write(linha)
+    except OSError:
+        # Falha no log nunca interrompe o painel nem o relatório
+        pass
+
+
+# ---------- RESUMO ----------
+# python medicao.py [logs/tempos.jsonl]
+# Percentis de cada etapa, separados por tipo de registro.
+
+if __name__ == "__main__":
+    import sys
+
+    import pandas as pd
+
+    caminho = sys.argv[1] if len(sys.argv) > 1 else CAMINHO_LOG
+    registros = pd.read_json(caminho, lines=True)
+    etapas = pd.json_normalize(registros["etapas"]).assign(tipo=registros["tipo"], total=registros["total_ms"])
+    longo = etapas.melt(id_vars="tipo", var_name="etapa", value_name="ms").dropna()
+    resumo = longo.groupby(["tipo", "etapa"])["ms"].describe(percentiles=[0.5, 0.95, 0.99])
+    with pd.option_context("display.max_rows", None, "display.width", 160):
+        print(resumo[["count", "50%", "95%", "99%", "max"]].round(2))
@@ -0,0 +1,122 @@
+# ============================
+# narrativa.py — Textos do relatório a partir da tabela por Estado
+# ============================
+#
+# Cada seção do relatório tem um modelo de frase com os campos da tabela
+# por Estado (CuboAgregado.estado). As frases de todos os Estados saem de
+# uma vez, concatenando colunas de texto já formatadas (formatacao.py),
+# sem laço por linha. No mesmo passo são calculados a participação de
+# cada Estado no total e a posição no ranking, usadas nos destaques
+# (maiores e menor Estado de cada métrica).
+
+# ---------- IMPORTS ----------
+import string
+from xml.sax.saxutils import escape
+
+import pandas as pd
+
+from formatacao import formatar_inteiros, formatar_moedas, formatar_percentuais
+
+# ---------- DICIONÁRIO DE SIGLAS ----------
+sigla_para_estado = {
+    "AC": "Acre", "AL": "Alagoas", "AP": "Amapá", "AM": "Amazonas",
+    "BA": "Bahia", "CE": "Ceará", "DF": "Distrito Federal", "ES": "Espírito Santo",
+    "GO": "Goiás", "MA": "Maranhão", "MT": "Mato Grosso", "MS": "Mato Grosso do Sul",
+    "MG": "Minas Gerais", "PA": "Pará", "PB": "Paraíba", "PR": "Paraná",
+    "PE": "Pernambuco", "PI": "Piauí", "RJ": "Rio de Janeiro", "RN": "Rio Grande do Norte",
+    "RS": "Rio Grande do Sul", "RO": "Rondônia", "RR": "Roraima", "SC": "Santa Catarina",
+    "SP": "São Paulo", "SE": "Sergipe", "TO": "Tocantins"
+}
+
+# ---------- MODELOS ----------
+# Campos entre chaves: {estado} (nome por extenso) ou uma coluna da tabela
+# por Estado, já formatada. Marcação do reportlab (<b>) é permitida.
+
+MODELOS = {
+    "empregos": "Em <b>{estado}</b> foram gerados cerca de <b>{Empregos} empregos</b>.",
+    "estabelecimentos": "Em {estado}, contabilizam-se aproximadamente {Estabelecimentos} estabelecimentos turísticos.",
+    "visitas": "Em {estado}, contabilizaram-se {Visitas Nacionais} visitas nacionais "
+               "e {Visitas Internacionais} visitas internacionais.",
+    "arrecadacao": "No estado de {estado}, a arrecadação foi de aproximadamente {Arrecadação}.",
+}
+
+# Métrica e nome usado nos destaques de cada seção
+DESTAQUES = {
+    "empregos": ("Empregos", "empregos"),
+    "estabelecimentos": ("Estabelecimentos", "estabelecimentos"),
+    "visitas": ("Visitas", "visitas"),
+    "arrecadacao": ("Arrecadação", "arrecadação"),
+}
+
+# Quantos Estados entram na lista dos maiores
+TOPO = 3
+
+_MOEDA = {"Arrecadação"}
+
+
+def _preencher(modelo, colunas):
+    # Concatena os trechos fixos do modelo com as colunas de texto
+    texto = None
+    for literal, campo, _, _ in string.Formatter().parse(modelo):
+        partes = [literal] if literal else []
+        if campo is not None:
+            partes.append(colunas[campo])
+        for parte in partes:
+            texto = parte if texto is None else texto + parte
+    return texto
+
+
+def _lista(nomes):
+    # ["A", "B", "C"] -> "A, B e C"
+    return nomes[0] if len(nomes) == 1 else ", ".join(nomes[:-1]) + " e " + nomes[-1]
+
+
+# ---------- NARRATIVA ----------
+
+class Narrativa:
+    def __init__(self, df_uf):
+        siglas = df_uf["Estado"].astype(str)
+        self.n_estados = len(df_uf)
+        self.nomes = siglas.map(sigla_para_estado).fillna(siglas).map(escape)
+
+        metricas = [c for c in df_uf.columns if c != "Estado" and pd.api.types.is_numeric_dtype(df_uf[c])]
+        valores = df_uf[metricas]
+        self.colunas = {"estado": self.nomes}
+        for metrica in metricas:
+            formatar = formatar_moedas if metrica in _MOEDA else formatar_inteiros
+            self.colunas[metrica] = formatar(valores[metrica])
+
+        # Participação no total e posição (1 = maior) de cada métrica
+        totais = valores.sum()
+        self.participacao = valores.div(totais.where(totais != 0)).fillna(0)
+        self.posicao = valores.rank(ascending=False, method="first").astype(int)
+
+    def frases(self, chave):
+        if not self.n_estados:
+            return []
+        return _preencher(MODELOS[chave], self.colunas).tolist()
+
+    def destaques(self, chave):
+        metrica, rotulo = DESTAQUES[chave]
+        if self.n_estados < 2 or metrica not in self.posicao:
+            return []
+        ordem = self.posicao[metrica].sort_values().index
+        valores = self.colunas[metrica]
+        participacao = formatar_percentuais(self.participacao[metrica])
+
+        lider = ordem[0]
+        frases = [f"<b>Destaque:</b> {self.nomes[lider]} concentra {participacao[lider]} do total de {rotulo} "
+                  f"({valores[lider]})."]
+        if self.n_estados > TOPO:
+            topo = ordem[:TOPO]
+            soma_topo = formatar_percentuais(pd.Series([self.participacao[metrica][topo].sum()]))[0]
+            ultimo = ordem[-1]
+            frases.append(f"Os {TOPO} maiores ({_lista([self.nomes[i] for i in topo])}) somam {soma_topo}; "
+                          f"o menor valor é o de {self.nomes[ultimo]} ({valores[ultimo]}, "
+                          f"{participacao[ultimo]}).")
+        return frases
+
+    def paragrafos(self, chave, estilo):
+        from reportlab.platypus import Paragraph
+
+        return [Paragraph(texto, estilo) for texto in self.frases(chave) + self.destaques(chave)]
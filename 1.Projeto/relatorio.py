@@ -0,0 +1,335 @@
+# ============================
+# relatorio.py — Montagem do Relatório PDF
+# ============================
+#
+# Tudo aqui roda fora da thread do Streamlit (em processos da fila de
+# relatórios), então as funções recebem apenas dados simples: a tabela de
+# somas por Estado (CuboAgregado.estado) e a tupla de KPIs.
+
+# ---------- IMPORTS ----------
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+# reportlab para montar PDF
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Table, TableStyle
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import inch
+from reportlab.lib import colors
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.enums import TA_RIGHT
+
+from cache_relatorios import FUSO_HORARIO
+from formatacao import formatar_inteiro, formatar_moeda
+from medicao import Cronometro, registrar
+from narrativa import Narrativa
+from tarefas import contexto_processos
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# ---------- TEXTOS FIXOS ----------
+texto_intro = """
+Este relatório foi desenvolvido para fornecer uma visão completa sobre o desempenho dos polos turísticos, empregos, estabelecimentos e o nível de engajamento de visitantes nos municípios.
+A análise utiliza informações reais da base do IBGE, com o objetivo de avaliar tendências, padrões de comportamento e indicadores que influenciam a economia e o turismo local.
+Este relatório apresenta gráficos e análises detalhadas para apoiar decisões estratégicas e políticas públicas.
+"""
+
+texto_emp = "Os resultados observados indicam diferenças na geração de empregos."
+texto_est = "A partir das informações levantadas, é possível identificar a quantidade de estabelecimentos turísticos."
+texto_vis = "As informações disponíveis evidenciam o total de visitas."
+texto_arr = "Os dados apresentados demonstram os valores de arrecadação registrados."
+
+texto_kpi = "Os principais indicadores econômicos e turísticos por município são apresentados abaixo:"
+
+
+# ---------- GRÁFICOS (MATPLOTLIB, sem Kaleido) ----------
+# Os mesmos gráficos do painel, desenhados direto da tabela por Estado.
+# A arrecadação, como no painel, é a evolução por ano (serie_anos: somas
+# da seleção por Ano); com um ano só vira um gráfico por Estado.
+# Cada gráfico vira um PNG em memória (sem arquivos temporários).
+
+def evolucao(serie_anos):
+    # Há evolução para mostrar: a série tem mais de um ano
+    return serie_anos is not None and len(serie_anos) > 1
+
+
+def desenhar_grafico(chave, df_uf, serie_anos=None):
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import numpy as np
+
+    plt.figure(figsize=(8, 5))
+
+    if chave == "empregos":
+        plt.bar(df_uf["Estado"].astype(str), df_uf["Empregos"])
+
+    elif chave == "estabelecimentos":
+        plt.bar(df_uf["Estado"].astype(str), df_uf["Estabelecimentos"])
+
+    elif chave == "visitas":
+        # Ordenar do maior para o menor (baseado em visitas nacionais)
+        visitas = df_uf.sort_values(by="Visitas Nacionais", ascending=False)
+        categorias = visitas["Estado"].astype(str).tolist()
+        pos = np.arange(len(categorias))
+        largura = 0.35
+
+        # Azul = Nacional
+        plt.barh(pos - largura/2, visitas["Visitas Nacionais"], largura,
+                 label="Visitas Nacionais", color="#1C4D86")
+
+        # Laranja = Internacional
+        plt.barh(pos + largura/2, visitas["Visitas Internacionais"], largura,
+                 label="Visitas Internacionais", color="#F5A623")
+
+        plt.yticks(pos, categorias)
+        plt.gca().invert_yaxis()
+        plt.legend()
+
+    elif chave == "arrecadacao" and serie_anos is not None:
+        serie = serie_anos.sort_values("Ano")
+        plt.plot(serie["Ano"], serie["Arrecadação"], marker='o', color="#F5A623")
+        plt.xticks(serie["Ano"].tolist())
+
+    elif chave == "arrecadacao":
+        plt.bar(df_uf["Estado"].astype(str), df_uf["Arrecadação"], color="#F5A623")
+
+    plt.xticks(rotation=45)
+    plt.tight_layout()
+    buffer = io.BytesIO()
+    plt.savefig(buffer, format="png", dpi=300)
+    plt.close()
+    return buffer.getvalue()
+
+
+# Seções do relatório: gráfico, título, texto fixo; as frases por Estado
+# e os destaques de cada seção vêm de narrativa.py (mesma chave)
+GRAFICOS = [
+    ("empregos", "Quantidade de empregos por Estado", texto_emp),
+    ("estabelecimentos", "Quantidade de estabelecimentos turísticos por Estado", texto_est),
+    ("visitas", "Comparação entre visitas nacionais e internacionais", texto_vis),
+    ("arrecadacao", "Evolução da arrecadação turística", texto_arr),
+]
+
+# Título da seção de arrecadação quando o período tem um ano só
+TITULO_ARRECADACAO_ESTADO = "Arrecadação turística por Estado"
+
+
+# Os quatro gráficos são independentes e o matplotlib não libera o GIL,
+# então cada um é desenhado num processo (mesmo método de início da fila,
+# tarefas.contexto_processos). O pool dura só o relatório: um pool aberto
+# dentro de um processo da fila impediria esse processo de encerrar.
+def desenhar_graficos(df_uf, paralelo=True, modo="vetor", serie_anos=None):
+    # Retorna {chave: Flowable ou a exceção que impediu o desenho}.
+    # modo="vetor" desenha com reportlab.graphics (padrão: PDF menor e
+    # mais rápido); modo="png" mantém a rasterização pelo matplotlib.
+    chaves = [chave for chave, *_ in GRAFICOS]
+    # Só a série com mais de um ano segue para os desenhos
+    serie_anos = serie_anos if evolucao(serie_anos) else None
+    if modo == "vetor":
+        from graficos_vetoriais import desenhar_grafico_vetorial
+
+        desenhos = {}
+        for chave in chaves:
+            try:
+                desenhos[chave] = desenhar_grafico_vetorial(chave, df_uf, serie_anos)
+            except Exception as e:
+                desenhos[chave] = e
+        return desenhos
+
+    imagens = _desenhar_pngs(df_uf, serie_anos, chaves, paralelo)
+    return {chave: imagem if isinstance(imagem, Exception)
+            else Image(io.BytesIO(imagem), width=5*inch, height=3.5*inch)
+            for chave, imagem in imagens.items()}
+
+
+def _desenhar_pngs(df_uf, serie_anos, chaves, paralelo):
+    if paralelo:
+        try:
+            with ProcessPoolExecutor(max_workers=len(chaves), mp_context=contexto_processos()) as pool:
+                futuros = {chave: pool.submit(desenhar_grafico, chave, df_uf, serie_anos)
+                           for chave in chaves}
+                return {chave: futuros[chave].exception() or futuros[chave].result()
+                        for chave in chaves}
+        except (OSError, RuntimeError):
+            # Sem permissão para criar processos: desenha em sequência
+            pass
+
+    imagens = {}
+    for chave in chaves:
+        try:
+            imagens[chave] = desenhar_grafico(chave, df_uf, serie_anos)
+        except Exception as e:
+            imagens[chave] = e
+    return imagens
+
+
+# ---------- PDF ----------
+# progresso(fracao, etapa) é chamado a cada etapa concluída. Com
+# contexto_log (sessão, filtros...), os tempos das etapas vão para o log
+# de medicao.py. Retorna (pdf_bytes, gerado_em): gerado_em é o timestamp
+# impresso como "Gerado em", para quem guarda ou oferece o PDF usar o
+# mesmo horário. serie_anos: somas da seleção por Ano (colunas Ano e
+# Arrecadação), para a evolução da arrecadação.
+
+def gerar_pdf(df_uf, kpis, progresso=None, paralelo=True, versao_dados=None, modo_graficos="vetor",
+              contexto_log=None, serie_anos=None):
+    cronometro = Cronometro()
+
+    def avisar(fracao, etapa):
+        if progresso is not None:
+            progresso(fracao, etapa)
+
+    total_empregos, qtd_estabelecimentos, visitas_nac, visitas_int, arrecadacao = kpis
+    avisar(0.0, "Montando o relatório")
+
+    styles = getSampleStyleSheet()
+    story = []
+
+    # ----- TÍTULO PDF -----
+    ibge_path = os.path.join(BASE_DIR, "IBGE.png")
+    if os.path.exists(ibge_path):
+        logo = Image(ibge_path, width=60, height=60)
+        story.append(logo)
+        story.append(Spacer(1, 6))
+
+    story.append(Paragraph(
+        "<b>Painel de Desenvolvimento Econômico e Turístico</b>",
+        styles["Title"]
+    ))
+
+    agora = datetime.now(FUSO_HORARIO)
+    data_formatada = agora.strftime("%d/%m/%Y %H:%M")
+    styles.add(ParagraphStyle(
+        name="DataDireita",
+        parent=styles["Normal"],
+        fontSize=8,
+        alignment=TA_RIGHT
+    ))
+
+    # Com cache de relatórios, o mesmo PDF pode ser entregue depois; a
+    # versão dos dados deixa claro a que base o horário se refere
+    rodape_data = f"Gerado em: {data_formatada}"
+    if versao_dados:
+        rodape_data += f" · dados versão {versao_dados}"
+    story.append(Paragraph(rodape_data, styles["DataDireita"]))
+    story.append(Spacer(1, 12))
+
+    # ----- TEXTO DE INTRODUÇÃO -----
+    story.append(Paragraph(texto_intro, styles["Normal"]))
+    story.append(Spacer(1, 18))
+
+    story.append(Paragraph(texto_kpi, styles["Normal"]))
+    story.append(Spacer(1, 18))
+
+    # ----- KPIs lado a lado -----
+    kpis = [
+        ["Total de Empregos", formatar_inteiro(total_empregos)],
+        ["Estabelecimentos", formatar_inteiro(qtd_estabelecimentos)],
+        ["Visitas Nacionais", formatar_inteiro(visitas_nac)],
+        ["Visitas Internacionais", formatar_inteiro(visitas_int)],
+        ["Arrecadação", formatar_moeda(arrecadacao)]
+    ]
+    table_data = [[kpi[0] + "\n" + kpi[1] for kpi in kpis]]
+    t = Table(table_data, colWidths=[1.5*inch]*5, hAlign='CENTER')
+    t.setStyle(TableStyle([
+        ('BACKGROUND', (0,0), (-1,0), colors.HexColor("#1C4D86")),
+        ('TEXTCOLOR', (0,0), (-1,0), colors.white),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('INNERGRID', (0, 0), (-1, -1), 0.5, colors.white)
+    ]))
+    story.append(t)
+    story.append(Spacer(1, 12))
+
+    titulo_menor = ParagraphStyle(
+        name="TituloMenor",
+        fontSize=14,
+        leading=16,
+        textColor=colors.black,
+        spaceAfter=10
+    )
+
+    # ----- Inserir gráficos + markdowns -----
+    avisar(0.1, "Desenhando os gráficos")
+    with cronometro.etapa("relatorio.graficos"):
+        # Seleção vazia: os eixos do reportlab não têm como ser calculados
+        # sem valores, e cada gráfico dá lugar a um aviso
+        graficos = desenhar_graficos(df_uf, paralelo=paralelo, modo=modo_graficos,
+                                     serie_anos=serie_anos) if len(df_uf) else {}
+    avisar(0.7, "Montando as seções")
+
+    with cronometro.etapa("relatorio.secoes"):
+        narrativa = Narrativa(df_uf)
+        for chave, titulo, descricao in GRAFICOS:
+            if chave == "arrecadacao" and not evolucao(serie_anos):
+                titulo = TITULO_ARRECADACAO_ESTADO
+            story.append(Paragraph(f"<b>{titulo}</b>", titulo_menor))
+            grafico = graficos.get(chave)
+            if grafico is None:
+                story.append(Paragraph("Sem dados para a seleção atual.", styles["Normal"]))
+                story.append(Spacer(1, 6))
+            elif isinstance(grafico, Exception):
+                story.append(Paragraph(f"Erro ao gerar gráfico: {grafico}", styles["Normal"]))
+            else:
+                story.append(grafico)
+                story.append(Spacer(1, 6))
+
+            if descricao:
+                story.append(Paragraph(descricao, styles["Normal"]))
+                story.append(Spacer(1, 6))
+
+            paragrafos = narrativa.paragrafos(chave, styles["Normal"])
+            if paragrafos:
+                story.extend(paragrafos)
+                story.append(Spacer(1, 14))
+
+    # ----- Logo e assinatura -----
+    logo_path = os.path.join(BASE_DIR, "logo.png")
+    if os.path.exists(logo_path):
+        logo_final = Image(logo_path, width=60, height=60)
+        assinatura = Table([[ '', logo_final ]], colWidths=[400, 60])
+        assinatura.setStyle(TableStyle([
+            ('VALIGN', (0, 0), (-1, -1), 'BOTTOM'),
+            ('ALIGN', (1, 0), (1, 0), 'RIGHT'),
+            ('ALIGN', (0, 0), (0, 0), 'LEFT')
+        ]))
+        story.append(Spacer(1, 20))
+        story.append(assinatura)
+        story.append(Spacer(1, 20))
+
+    # ----- Gerar PDF -----
+    avisar(0.85, "Gerando o PDF")
+    with cronometro.etapa("relatorio.montagem_pdf"):
+        buffer_pdf = io.BytesIO()
+        doc = SimpleDocTemplate(buffer_pdf, pagesize=A4)
+        doc.build(story)
+        pdf_bytes = buffer_pdf.getvalue()
+
+    if contexto_log is not None:
+        registrar("relatorio", cronometro, modo_graficos=modo_graficos, pdf_bytes=len(pdf_bytes), **contexto_log)
+    avisar(1.0, "Concluído")
+    return pdf_bytes, agora.timestamp()
+
+
+# ---------- MEDIÇÃO ----------
+# python relatorio.py
+# Compara o relatório com gráficos vetoriais e com PNGs de 300 dpi para o
+# conjunto completo de dados (tamanho do PDF e tempo de montagem).
+
+if __name__ == "__main__":
+    import time
+
+    from agregacao import CuboAgregado
+    from dados import carregar_planilha
+
+    df, versao = carregar_planilha(os.path.join(BASE_DIR, "planilha.xlsx"))
+    cubo = CuboAgregado(df)
+
+    for modo in ("png", "vetor"):
+        inicio = time.perf_counter()
+        pdf, _ = gerar_pdf(cubo.estado, cubo.kpis(), versao_dados=versao, modo_graficos=modo)
+        print(f"{modo:<6} {len(pdf) / 1024:9.1f} KiB {time.perf_counter() - inicio:7.2f} s")
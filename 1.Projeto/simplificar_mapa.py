@@ -0,0 +1,198 @@
+# ============================
+# simplificar_mapa.py — Gera os níveis simplificados do mapa.json
+# ============================
+#
+# Uso: python simplificar_mapa.py [mapa.json]
+#
+# Para cada nível de geometria.NIVEIS é gravado um mapa_<nivel>.json com os
+# polígonos simplificados (Douglas-Peucker) e coordenadas arredondadas.
+# A topologia é preservada: os vértices onde a fronteira deixa de ser
+# compartilhada entre municípios (junções) nunca são removidos, e cada
+# trecho entre junções é simplificado sempre no mesmo sentido, então dois
+# vizinhos continuam com exatamente a mesma borda, sem frestas nem
+# sobreposições.
+
+# ---------- IMPORTS ----------
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from geometria import NIVEIS, caminho_nivel
+
+CASAS_DECIMAIS = 5  # ~1 m no equador
+
+
+# ---------- DOUGLAS-PEUCKER ----------
+
+def _douglas_peucker(pontos, tolerancia):
+    pontos = np.asarray(pontos, dtype=float)
+    n = len(pontos)
+    if n <= 2:
+        return pontos
+    manter = np.zeros(n, dtype=bool)
+    manter[0] = manter[-1] = True
+    pilha = [(0, n - 1)]
+    while pilha:
+        ini, fim = pilha.pop()
+        if fim - ini < 2:
+            continue
+        a, b = pontos[ini], pontos[fim]
+        meio = pontos[ini + 1:fim]
+        ab = b - a
+        comprimento = np.hypot(*ab)
+        if comprimento == 0:
+            dist = np.hypot(*(meio - a).T)
+        else:
+            dist = np.abs(ab[0] * (meio[:, 1] - a[1]) - ab[1] * (meio[:, 0] - a[0])) / comprimento
+        i = int(np.argmax(dist))
+        if dist[i] > tolerancia:
+            k = ini + 1 + i
+            manter[k] = True
+            pilha.append((ini, k))
+            pilha.append((k, fim))
+    return pontos[manter]
+
+
+# ---------- TOPOLOGIA ----------
+
+def _chave(ponto):
+    return (round(ponto[0], CASAS_DECIMAIS + 1), round(ponto[1], CASAS_DECIMAIS + 1))
+
+
+def _aneis(geometria):
+    if geometria is None:
+        return []
+    if geometria["type"] == "Polygon":
+        return list(geometria["coordinates"])
+    if geometria["type"] == "MultiPolygon":
+        return [anel for poligono in geometria["coordinates"] for anel in poligono]
+    return []
+
+
+def _vizinhos(features):
+    # Para cada vértice, o conjunto de vértices adjacentes em todos os anéis
+    vizinhos = {}
+    for feature in features:
+        for anel in _aneis(feature.get("geometry")):
+            chaves = [_chave(p) for p in anel[:-1]]
+            n = len(chaves)
+            for i, k in enumerate(chaves):
+                conjunto = vizinhos.setdefault(k, set())
+                conjunto.add(chaves[i - 1])
+                conjunto.add(chaves[(i + 1) % n])
+    return vizinhos
+
+
+def _simplificar_trecho(trecho, tolerancia, cache):
+    # Simplifica sempre no sentido canônico para que os dois municípios
+    # que compartilham o trecho obtenham o mesmo resultado
+    chaves = tuple(_chave(p) for p in trecho)
+    invertido = chaves[::-1] < chaves
+    canonico = chaves[::-1] if invertido else chaves
+    if canonico not in cache:
+        cache[canonico] = _douglas_peucker(canonico, tolerancia).tolist()
+    resultado = cache[canonico]
+    return resultado[::-1] if invertido else resultado
+
+
+def _simplificar_anel(anel, tolerancia, juncoes, cache):
+    pontos = anel[:-1]
+    n = len(pontos)
+    if n < 4:
+        return anel
+    fixos = [i for i, p in enumerate(pontos) if _chave(p) in juncoes]
+    if not fixos:
+        # Anel isolado (ou idêntico ao de um enclave): começa no menor
+        # vértice para que o resultado não dependa do ponto de partida
+        menor = min(range(n), key=lambda i: _chave(pontos[i]))
+        fixos = [menor, (menor + n // 2) % n]
+
+    novo = []
+    for j, ini in enumerate(fixos):
+        fim = fixos[(j + 1) % len(fixos)]
+        if fim > ini:
+            trecho = pontos[ini:fim + 1]
+        else:
+            trecho = pontos[ini:] + pontos[:fim + 1]
+        novo.extend(_simplificar_trecho(trecho, tolerancia, cache)[:-1])
+
+    # Um anel precisa de pelo menos 3 vértices distintos
+    if len(novo) < 3:
+        return anel
+    novo.append(novo[0])
+    return [[round(x, CASAS_DECIMAIS), round(y, CASAS_DECIMAIS)] for x, y in novo]
+
+
+def simplificar(geojson, tolerancia):
+    features = geojson.get("features", [])
+    vizinhos = _vizinhos(features)
+    juncoes = {k for k, v in vizinhos.items() if len(v) > 2}
+    cache = {}
+
+    def aneis(coordenadas):
+        return [_simplificar_anel(anel, tolerancia, juncoes, cache) for anel in coordenadas]
+
+    novas = []
+    for feature in features:
+        geometria = feature.get("geometry")
+        if geometria and geometria["type"] == "Polygon":
+            geometria = {"type": "Polygon", "coordinates": aneis(geometria["coordinates"])}
+        elif geometria and geometria["type"] == "MultiPolygon":
+            geometria = {"type": "MultiPolygon",
+                         "coordinates": [aneis(p) for p in geometria["coordinates"]]}
+        novas.append({**feature, "geometry": geometria})
+    return {**geojson, "features": novas}
+
+
+# ---------- RELATÓRIO DE GANHO ----------
+
+def _tempo_render(geojson):
+    # Tempo de montar e serializar o choropleth (o que o servidor envia
+    # ao navegador). A tesselação no navegador não é medida aqui, mas é
+    # proporcional à quantidade de vértices.
+    import pandas as pd
+    import plotly.express as px
+
+    codigos = [str(f["properties"]["id"]) for f in geojson["features"]]
+    df = pd.DataFrame({"codigo_ibge": codigos, "valor": range(len(codigos))})
+    inicio = time.perf_counter()
+    fig = px.choropleth_mapbox(df, geojson=geojson, locations="codigo_ibge",
+                               featureidkey="properties.id", color="valor",
+                               mapbox_style="carto-positron", zoom=3.3)
+    fig.to_json()
+    return time.perf_counter() - inicio
+
+
+def _vertices(geojson):
+    return sum(len(anel) for f in geojson["features"] for anel in _aneis(f.get("geometry")))
+
+
+if __name__ == "__main__":
+    BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+    caminho = sys.argv[1] if len(sys.argv) > 1 else os.path.join(BASE_DIR, "mapa.json")
+
+    with open(caminho, "r", encoding="utf-8") as f:
+        original = json.load(f)
+    bytes_original = os.path.getsize(caminho)
+    t_original = _tempo_render(original)
+
+    print(f"{'nível':<6} {'tolerância':>10} {'vértices':>10} {'bytes':>12} {'economia':>9} {'render':>9}")
+    print(f"{'alta':<6} {0:>10} {_vertices(original):>10} {bytes_original:>12} "
+          f"{'-':>9} {t_original * 1000:>7.0f}ms")
+
+    for nivel, tolerancia in NIVEIS.items():
+        if not tolerancia:
+            continue
+        simplificado = simplificar(original, tolerancia)
+        destino = caminho_nivel(caminho, nivel)
+        with open(destino, "w", encoding="utf-8") as f:
+            json.dump(simplificado, f, ensure_ascii=False, separators=(",", ":"))
+
+        tamanho = os.path.getsize(destino)
+        t_render = _tempo_render(simplificado)
+        print(f"{nivel:<6} {tolerancia:>10} {_vertices(simplificado):>10} {tamanho:>12} "
+              f"{1 - tamanho / bytes_original:>8.0%} {t_render * 1000:>7.0f}ms "
+              f"(-{(t_original - t_render) * 1000:.0f}ms)")
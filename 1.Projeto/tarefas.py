@@ -0,0 +1,102 @@
+# ============================
+# tarefas.py — Fila de relatórios em segundo plano
+# ============================
+
+# ---------- IMPORTS ----------
+import multiprocessing
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+
+# ---------- EXECUÇÃO NO PROCESSO TRABALHADOR ----------
+# O progresso é gravado num dicionário compartilhado (Manager), que a
+# sessão do Streamlit consulta enquanto o relatório é montado.
+
+def _executar(id_tarefa, progresso, funcao, args):
+    def avisar(fracao, etapa):
+        progresso[id_tarefa] = (fracao, etapa)
+
+    return funcao(*args, progresso=avisar)
+
+
+# ---------- FILA ----------
+# Pool de processos com tamanho fixo: muitos cliques simultâneos ficam na
+# fila em vez de ocupar as threads do servidor. Os resultados concluídos
+# ficam guardados até o limite de max_resultados (os mais antigos saem).
+
+def contexto_processos():
+    # O Streamlit executa o script como o módulo __main__ (com o __file__
+    # do app.py). Com "spawn" ou "forkserver", o multiprocessing reimporta
+    # esse __main__ em cada processo novo, que reexecutaria o app.py
+    # inteiro (carga dos dados, atualizador, aquecimento). Onde existe,
+    # usa "fork".
+    #
+    # Cuidado com o fork: o servidor tem várias threads (sessões,
+    # atualizador da base, aquecimento) e o filho herda a memória do
+    # instante da cópia, inclusive locks que outra thread estava segurando;
+    # pegar um deles no filho trava o processo para sempre. Os processos
+    # daqui só montam PDFs (reportlab, pandas, medicao.registrar): os
+    # locks do logging e das importações o Python refaz no filho, e o do
+    # log de tempos é refeito por os.register_at_fork (medicao.py). Código
+    # que passe a rodar nesses processos não pode usar outros locks do
+    # servidor (caches do Streamlit, fila, atualizador).
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context()
+
+
+class FilaRelatorios:
+    def __init__(self, max_workers=2, max_resultados=32):
+        contexto = contexto_processos()
+        self._executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=contexto)
+        self._gerente = contexto.Manager()
+        self._progresso = self._gerente.dict()
+        self._tarefas = OrderedDict()
+        self._max_resultados = max_resultados
+        self._lock = threading.Lock()
+
+    def enviar(self, funcao, *args, ao_concluir=None):
+        # ao_concluir(resultado) roda neste processo quando a tarefa termina
+        # sem erro (por exemplo, para guardar o PDF no cache)
+        id_tarefa = uuid.uuid4().hex[:12]
+        self._progresso[id_tarefa] = (0.0, "Aguardando na fila")
+        futuro = self._executor.submit(_executar, id_tarefa, self._progresso, funcao, args)
+        if ao_concluir is not None:
+            futuro.add_done_callback(
+                lambda f: ao_concluir(f.result()) if not f.cancelled() and f.exception() is None else None
+            )
+        with self._lock:
+            self._tarefas[id_tarefa] = {"futuro": futuro, "inicio": time.time()}
+            while len(self._tarefas) > self._max_resultados:
+                antigo, _ = self._tarefas.popitem(last=False)
+                self._progresso.pop(antigo, None)
+        return id_tarefa
+
+    def estado(self, id_tarefa):
+        # status: "desconhecida", "executando", "concluida" ou "erro"
+        with self._lock:
+            tarefa = self._tarefas.get(id_tarefa)
+        if tarefa is None:
+            return {"status": "desconhecida"}
+
+        futuro = tarefa["futuro"]
+        fracao, etapa = self._progresso.get(id_tarefa, (0.0, ""))
+        estado = {"status": "executando", "progresso": fracao, "etapa": etapa,
+                  "decorrido": time.time() - tarefa["inicio"]}
+        if futuro.done():
+            erro = futuro.exception()
+            if erro is not None:
+                estado.update(status="erro", erro=erro)
+            else:
+                estado.update(status="concluida", progresso=1.0, resultado=futuro.result())
+        return estado
+
+    def descartar(self, id_tarefa):
+        with self._lock:
+            tarefa = self._tarefas.pop(id_tarefa, None)
+        self._progresso.pop(id_tarefa, None)
+        if tarefa is not None:
+            tarefa["futuro"].cancel()
@@ -0,0 +1,25 @@
+# ============================
+# test_geometria.py — Nível de detalhe da malha pelo zoom
+# ============================
+#
+#   python -m pytest -q test_geometria.py
+
+# ---------- IMPORTS ----------
+import pytest
+
+from geometria import LIMITE_DETALHE, escolher_nivel, graus_por_pixel
+
+
+def test_graus_por_pixel_com_tiles_de_512():
+    # Zoom 0: o mundo inteiro (360°) num tile de 512 px
+    assert graus_por_pixel(0) == pytest.approx(360 / 512)
+
+
+def test_nivel_no_zoom_do_painel():
+    # ZOOM_MAPA (graficos.py) = 3.3: um pixel tem ~0,071°, meio pixel
+    # ~0,036°; "baixa" (0,05°) passaria de meio pixel
+    assert escolher_nivel(3.3, LIMITE_DETALHE + 1) == "media"
+
+
+def test_poucos_municipios_mantem_a_malha_original():
+    assert escolher_nivel(3.3, LIMITE_DETALHE) == "alta"
@@ -0,0 +1,48 @@
+# ============================
+# test_relatorio.py — Relatório PDF com a seleção vazia
+# ============================
+#
+#   python -m pytest -q test_relatorio.py
+
+# ---------- IMPORTS ----------
+import pandas as pd
+import pytest
+
+from agregacao import CuboAgregado, DIMENSOES, METRICAS
+
+pytest.importorskip("reportlab")
+
+
+def _cubo_vazio():
+    # Mesmo cubo que o painel monta quando nenhum Estado é escolhido
+    return CuboAgregado(pd.DataFrame({coluna: pd.Series(dtype="category") for coluna in DIMENSOES}
+                                     | {metrica: pd.Series(dtype="int32") for metrica in METRICAS}))
+
+
+@pytest.mark.parametrize("modo_graficos", ["vetor", "png"])
+def test_pdf_com_selecao_vazia(modo_graficos):
+    from relatorio import gerar_pdf
+
+    cubo = _cubo_vazio()
+    assert cubo.estado.empty
+
+    pdf, _ = gerar_pdf(cubo.estado, cubo.kpis(), paralelo=False, modo_graficos=modo_graficos)
+    assert pdf.startswith(b"%PDF")
+
+
+def test_arrecadacao_por_ano_ou_por_estado():
+    from reportlab.graphics.charts.barcharts import VerticalBarChart
+    from reportlab.graphics.charts.linecharts import HorizontalLineChart
+
+    from relatorio import desenhar_graficos
+
+    df_uf = pd.DataFrame({"Estado": ["SP", "RJ"], "Arrecadação": [10, 20]})
+    serie_anos = pd.DataFrame({"Ano": [2021, 2018], "Arrecadação": [30, 25]})
+
+    linha = desenhar_graficos(df_uf, serie_anos=serie_anos)["arrecadacao"].contents[0]
+    assert isinstance(linha, HorizontalLineChart)
+    assert linha.categoryAxis.categoryNames == ["2018", "2021"]
+
+    # Um ano só: não há evolução, a arrecadação sai por Estado
+    barras = desenhar_graficos(df_uf, serie_anos=serie_anos[:1])["arrecadacao"].contents[0]
+    assert isinstance(barras, VerticalBarChart)
@@ -0,0 +1,277 @@
+# ============================
+# teste_carga.py — Sessões simultâneas do painel, sem navegador
+# ============================
+#
+# Cada sessão simulada é um AppTest do Streamlit (o app.py roda de verdade,
+# no mesmo processo, com os mesmos caches compartilhados de um servidor)
+# numa thread própria, repetindo o que um usuário faz: troca Estados,
+# escolhe municípios, muda de aba e pede o PDF. Para cada nível de
+# concorrência mostra a vazão (execuções do script por segundo), os
+# percentis da latência de cada execução e o pico de memória. Nada sai da
+# máquina: não há servidor, porta nem navegador.
+#
+#   python teste_carga.py                          # 1, 2, 4 e 8 sessões
+#   python teste_carga.py --sessoes 1 4 16 --passos 30 --saida carga.json
+
+# ---------- IMPORTS ----------
+import argparse
+import json
+import os
+import random
+import resource
+import sys
+import threading
+import time
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+APP = os.path.join(BASE_DIR, "app.py")
+
+# As execuções simuladas não entram no log de tempos do painel (medicao.py),
+# a não ser que PAINEL_LOG_TEMPOS seja definido
+os.environ.setdefault("PAINEL_LOG_TEMPOS", "")
+
+ABA_TURISMO = "📊 Indicadores do Turismo"
+ABA_ARRECADACAO = "📈 Indicadores de Arrecadação"
+ABA_RELATORIO = "📄 Relatório (PDF)"
+
+# Peso de cada ação na sequência de uma sessão
+ACOES = {"estado": 4, "municipio": 3, "aba": 4, "relatorio": 1}
+
+# Espera máxima pelo PDF de um pedido (s)
+ESPERA_RELATORIO = 120
+
+
+# ---------- APPTEST EM PARALELO ----------
+# O AppTest foi feito para testes de uma sessão: cada execução instala um
+# Runtime falso global (Runtime._instance) e o remove no fim, o que
+# derrubaria as outras sessões ainda executando. Aqui o AppTest passa a
+# gravar num Runtime derivado, que repassa o Runtime instalado para o
+# global e ignora a remoção.
+
+def _permitir_sessoes_simultaneas():
+    import streamlit.testing.v1.app_test as app_test
+    from streamlit.runtime import Runtime
+
+    class _Registro(type):
+        def __setattr__(cls, nome, valor):
+            if nome == "_instance" and valor is not None:
+                Runtime._instance = valor
+            super().__setattr__(nome, valor)
+
+    class RuntimeCompartilhado(Runtime, metaclass=_Registro):
+        pass
+
+    app_test.Runtime = RuntimeCompartilhado
+
+
+# ---------- SESSÃO SIMULADA ----------
+
+class SessaoSimulada:
+    def __init__(self, semente, timeout=300):
+        from streamlit.testing.v1 import AppTest
+
+        self.at = AppTest.from_file(APP, default_timeout=timeout)
+        self.sorteio = random.Random(semente)
+        self.aba = ABA_TURISMO
+        self.latencias_ms = []
+        self.relatorios_s = []
+        self.erros = []
+
+    def executar(self):
+        # As abas só rodam quando abertas (st.tabs com on_change): o
+        # AppTest precisa receber a aba atual antes de cada execução
+        self.at.session_state["aba"] = self.aba
+        inicio = time.perf_counter()
+        self.at.run()
+        self.latencias_ms.append((time.perf_counter() - inicio) * 1000)
+        for erro in list(self.at.exception) + list(self.at.error):
+            self.erros.append(str(erro.value)[:200])
+
+    def _widget(self, tipo, rotulo):
+        return next((w for w in getattr(self.at, tipo) if w.label == rotulo), None)
+
+    # ----- AÇÕES -----
+
+    def trocar_estado(self):
+        estados = self._widget("multiselect", "Estado")
+        opcoes = list(estados.options)
+        if self.sorteio.random() < 0.25:
+            escolhidos = opcoes
+        else:
+            escolhidos = self.sorteio.sample(opcoes, self.sorteio.randint(1, min(3, len(opcoes))))
+        estados.set_value(escolhidos)
+        self.executar()
+
+    def trocar_municipio(self):
+        modo = self.at.radio(key="modo_municipio")
+        novo_modo = self.sorteio.choice(["Todos", "Somente", "Exceto"])
+        modo.set_value(novo_modo)
+        self.executar()
+        if novo_modo == "Todos":
+            return
+        lista = self._widget("multiselect", "Incluir" if novo_modo == "Somente" else "Excluir")
+        opcoes = list(lista.options)
+        if opcoes:
+            lista.set_value(self.sorteio.sample(opcoes, min(len(opcoes), self.sorteio.randint(1, 5))))
+            self.executar()
+
+    def trocar_aba(self):
+        self.aba = self.sorteio.choice([a for a in (ABA_TURISMO, ABA_ARRECADACAO, ABA_RELATORIO) if a != self.aba])
+        self.executar()
+
+    def pedir_relatorio(self):
+        if self.aba != ABA_RELATORIO:
+            self.aba = ABA_RELATORIO
+            self.executar()
+        inicio = time.perf_counter()
+        self._widget("button", "📄 Gerar Relatório em PDF").click()
+        self.executar()
+        # Como o navegador faz: novas execuções até o PDF aparecer
+        while not self.at.success and time.perf_counter() - inicio < ESPERA_RELATORIO:
+            time.sleep(0.5)
+            self.executar()
+        if self.at.success:
+            self.relatorios_s.append(time.perf_counter() - inicio)
+        else:
+            self.erros.append("relatório não ficou pronto")
+
+    def rodar(self, passos):
+        acoes = {"estado": self.trocar_estado, "municipio": self.trocar_municipio,
+                 "aba": self.trocar_aba, "relatorio": self.pedir_relatorio}
+        self.executar()
+        for _ in range(passos):
+            nome = self.sorteio.choices(list(ACOES), weights=list(ACOES.values()))[0]
+            try:
+                acoes[nome]()
+            except Exception as erro:
+                self.erros.append(f"{nome}: {type(erro).__name__}: {erro}"[:200])
+
+
+# ---------- MEMÓRIA ----------
+# Pico de RSS durante cada nível, somando os processos da fila de
+# relatórios (filhos deste processo). Fora do Linux só há o pico do
+# processo inteiro (ru_maxrss).
+
+def _rss_kib(pid):
+    try:
+        with open(f"/proc/{pid}/status") as arquivo:
+            for linha in arquivo:
+                if linha.startswith("VmRSS:"):
+                    return int(linha.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def _filhos(pid):
+    filhos = []
+    try:
+        for tid in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{tid}/children") as arquivo:
+                filhos.extend(int(p) for p in arquivo.read().split())
+    except OSError:
+        pass
+    return filhos
+
+
+class MonitorMemoria:
+    def __init__(self, intervalo=0.05):
+        self.intervalo = intervalo
+        self.pico_kib = 0
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._amostrar, daemon=True)
+
+    def _amostrar(self):
+        while True:
+            pid = os.getpid()
+            total = _rss_kib(pid) + sum(_rss_kib(filho) for filho in _filhos(pid))
+            self.pico_kib = max(self.pico_kib, total)
+            if self._parar.wait(self.intervalo):
+                return
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *_):
+        self._parar.set()
+        self._thread.join()
+        if not self.pico_kib:
+            # ru_maxrss: KiB no Linux, bytes no macOS
+            pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            self.pico_kib = pico // 1024 if sys.platform == "darwin" else pico
+
+
+# ---------- NÍVEL DE CONCORRÊNCIA ----------
+
+def medir_nivel(sessoes, passos, semente):
+    simuladas = [SessaoSimulada(semente * 1000 + i) for i in range(sessoes)]
+    threads = [threading.Thread(target=s.rodar, args=(passos,)) for s in simuladas]
+    with MonitorMemoria() as monitor:
+        inicio = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        duracao = time.perf_counter() - inicio
+
+    latencias = np.array([ms for s in simuladas for ms in s.latencias_ms])
+    relatorios = [seg for s in simuladas for seg in s.relatorios_s]
+    p50, p95, p99 = np.percentile(latencias, [50, 95, 99])
+    return {
+        "sessoes": sessoes,
+        "execucoes": len(latencias),
+        "duracao_s": round(duracao, 3),
+        "vazao_execucoes_s": round(len(latencias) / duracao, 3),
+        "p50_ms": round(p50, 1),
+        "p95_ms": round(p95, 1),
+        "p99_ms": round(p99, 1),
+        "max_ms": round(latencias.max(), 1),
+        "relatorios": len(relatorios),
+        "relatorio_p50_s": round(float(np.median(relatorios)), 2) if relatorios else None,
+        "pico_rss_mib": round(monitor.pico_kib / 1024, 1),
+        "erros": [erro for s in simuladas for erro in s.erros],
+    }
+
+
+# ---------- LINHA DE COMANDO ----------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Teste de carga do painel com sessões simuladas (AppTest).")
+    parser.add_argument("--sessoes", type=int, nargs="+", default=[1, 2, 4, 8],
+                        help="níveis de concorrência (sessões simultâneas)")
+    parser.add_argument("--passos", type=int, default=20, help="ações de cada sessão")
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--saida", default=None, help="grava o resultado em JSON")
+    args = parser.parse_args(argv)
+
+    _permitir_sessoes_simultaneas()
+
+    # Aquecimento: a primeira execução paga a carga dos dados, da malha e
+    # das importações, que um servidor em produção já teria feito
+    SessaoSimulada(-1).executar()
+
+    print(f"{'sessões':>7} {'execuções':>9} {'exec/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+          f" {'PDFs':>5} {'pico RSS':>10}")
+    niveis = []
+    for sessoes in args.sessoes:
+        nivel = medir_nivel(sessoes, args.passos, args.semente)
+        niveis.append(nivel)
+        print(f"{sessoes:>7} {nivel['execucoes']:>9} {nivel['vazao_execucoes_s']:>8.2f} {nivel['p50_ms']:>9.1f}"
+              f" {nivel['p95_ms']:>9.1f} {nivel['p99_ms']:>9.1f} {nivel['relatorios']:>5}"
+              f" {nivel['pico_rss_mib']:>7.1f} MiB", flush=True)
+        for erro in nivel["erros"][:5]:
+            print(f"        erro: {erro}", file=sys.stderr)
+
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            json.dump({"passos": args.passos, "semente": args.semente, "niveis": niveis},
+                      arquivo, ensure_ascii=False, indent=2)
+        print(f"\nResultado gravado em {args.saida}")
+    return 1 if any(nivel["erros"] for nivel in niveis) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())